@@ -0,0 +1,44 @@
+import argparse
+import math
+import time
+
+from scenes import build_scene
+
+def brute_force(running):
+    registry = running.world.registry
+    hits = 0
+    for shot in registry.each('SHOT'):
+        s_trans = shot.fetch('transform')
+        for foe in registry.each('FOE'):
+            f_trans = foe.fetch('transform')
+            dx = s_trans.x - f_trans.x
+            dz = s_trans.z - f_trans.z
+            if math.sqrt(dx*dx + dz*dz) < 2.2:
+                hits += 1
+                break
+    return hits
+
+def measure(fn, count, repeats):
+    best = float('inf')
+    for n in range(repeats):
+        running = build_scene(count, seed=n)
+        start = time.perf_counter()
+        fn(running)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Running._detect_impacts as entity counts grow.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[50, 100, 200, 400, 800, 1600])
+    parser.add_argument('--repeats', type=int, default=7)
+    args = parser.parse_args()
+    
+    print(f"{'entities':>8} {'grid ms':>9} {'grid us/ent':>12} {'brute ms':>9} {'brute us/ent':>13}")
+    for count in args.counts:
+        grid = measure(lambda r: r._detect_impacts(), count, args.repeats)
+        brute = measure(brute_force, count, args.repeats)
+        print(f"{count:>8} {grid * 1e3:>9.3f} {grid * 1e6 / count:>12.2f} "
+              f"{brute * 1e3:>9.3f} {brute * 1e6 / count:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dhaka_sim as sim
+
+def build_scene(density, seed=0, world_type=sim.World):
+    rng = random.Random(seed)
+    world = world_type()
+    world.invincible = True
+    world.start_run('Normal', seed)
+    running = world.active_phase
+    registry = world.registry
+    for obj_type in ('FOE', 'SHOT', 'BARRIER', 'TREASURE', 'BOOST'):
+        for obj in registry.filter_type(obj_type):
+            registry.remove(obj)
+    registry.flush()
+
+    hero_z = world.hero.fetch('transform').z
+    for n in range(density):
+        z = hero_z - 10 - n * 300 / density
+        kind = n % 5
+        if kind == 0:
+            running._create_foe(z)
+        elif kind == 1:
+            running._create_barrier(z)
+        elif kind == 2:
+            running._create_item(rng.choice(('TREASURE', 'BOOST')), z)
+        else:
+            origin = 'HERO' if kind == 3 else 'FOE'
+            running._launch_shot([rng.choice(sim.LANES), 1.1, z], origin)
+    world.step(sim.SIM_STEP)
+    return running
@@ -0,0 +1,113 @@
+import re
+import sys
+import types
+import numpy as np
+
+NAME_PATTERN = re.compile(r'\b(?:glut|glu|gl)[A-Z]\w*|\bGL(?:UT?)?_[A-Z0-9_]+')
+
+def perspective(fovy, aspect, near, far):
+    f = 1 / np.tan(np.radians(fovy) / 2)
+    return np.array([
+        [f / aspect, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+        [0, 0, -1, 0]
+    ])
+
+def look_at(ex, ey, ez, cx, cy, cz, ux, uy, uz):
+    eye = np.array([ex, ey, ez], dtype=float)
+    f = np.array([cx, cy, cz]) - eye
+    f /= np.linalg.norm(f)
+    s = np.cross(f, [ux, uy, uz])
+    s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+    m = np.eye(4)
+    m[0, :3], m[1, :3], m[2, :3] = s, u, -f
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+def ortho(left, right, bottom, top, near=-1, far=1):
+    m = np.eye(4)
+    m[0, 0], m[1, 1], m[2, 2] = 2 / (right - left), 2 / (top - bottom), -2 / (far - near)
+    m[:3, 3] = [-(right + left) / (right - left), -(top + bottom) / (top - bottom), -(far + near) / (far - near)]
+    return m
+
+class Const(int):
+    def __new__(cls, name, value):
+        const = super().__new__(cls, value)
+        const.name = name
+        return const
+    
+    def __repr__(self):
+        return self.name
+
+class Recorder:
+    def __init__(self):
+        self.calls = {}
+        self.next_list = 1
+        self.stacks = {'modelview': [np.eye(4)], 'projection': [np.eye(4)]}
+        self.mode = 'modelview'
+    
+    def reset(self):
+        self.calls.clear()
+    
+    def total(self):
+        return sum(self.calls.values())
+    
+    def apply(self, m):
+        stack = self.stacks[self.mode]
+        stack[-1] = stack[-1] @ m
+    
+    def call(self, name, args):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name == 'glGenLists':
+            base = self.next_list
+            self.next_list += args[0]
+            return base
+        if name == 'gluNewQuadric':
+            return object()
+        if name == 'glGetError':
+            return 0
+        if name == 'glMatrixMode':
+            self.mode = 'projection' if args[0].name == 'GL_PROJECTION' else 'modelview'
+        elif name == 'glLoadIdentity':
+            self.stacks[self.mode][-1] = np.eye(4)
+        elif name == 'glPushMatrix':
+            self.stacks[self.mode].append(self.stacks[self.mode][-1].copy())
+        elif name == 'glPopMatrix':
+            self.stacks[self.mode].pop()
+        elif name == 'gluPerspective':
+            self.apply(perspective(*args))
+        elif name == 'gluLookAt':
+            self.apply(look_at(*args))
+        elif name == 'gluOrtho2D':
+            self.apply(ortho(*args))
+        elif name == 'glGetDoublev':
+            which = 'projection' if args[0].name == 'GL_PROJECTION_MATRIX' else 'modelview'
+            return self.stacks[which][-1].T.copy()
+        return None
+
+def install(*sources):
+    names = set()
+    for path in sources:
+        with open(path) as f:
+            names.update(NAME_PATTERN.findall(f.read()))
+
+    recorder = Recorder()
+    namespace = {}
+    for value, name in enumerate(sorted(names), start=1):
+        if name.startswith('GL'):
+            namespace[name] = Const(name, 1 << value % 31)
+        else:
+            namespace[name] = lambda *args, name=name: recorder.call(name, args)
+
+    package = types.ModuleType('OpenGL')
+    package.__path__ = []
+    sys.modules['OpenGL'] = package
+    for sub in ('GL', 'GLU', 'GLUT'):
+        module = types.ModuleType('OpenGL.' + sub)
+        module.__dict__.update(namespace)
+        module.__all__ = sorted(namespace)
+        setattr(package, sub, module)
+        sys.modules['OpenGL.' + sub] = module
+    return recorder
@@ -0,0 +1,217 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RENDER = os.path.join(ROOT, 'dhaka_render.py')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dhaka_sim as sim
+from scenes import build_scene
+
+DENSITIES = (50, 200, 800)
+FRAME_BUDGET_MS = 1000 / 60
+
+def time_calls(setup, fn, repeats, number):
+    samples = []
+    for n in range(repeats):
+        state = setup(n)
+        start = time.perf_counter()
+        for k in range(number):
+            fn(state)
+        samples.append((time.perf_counter() - start) / number)
+    ms = np.array(samples) * 1000
+    return {'median_ms': float(np.median(ms)), 'min_ms': float(ms.min()), 'repeats': repeats, 'number': number}
+
+def churn(registry):
+    made = [registry.create(('FOE', 'SHOT', 'BARRIER')[n % 3]) for n in range(300)]
+    for obj in made:
+        registry.remove(obj)
+    registry.flush()
+
+def invalidated_slots(registry):
+    registry.slot_cache.clear()
+    registry.slots('BARRIER')
+
+def sim_benchmarks(repeats):
+    results = {}
+
+    def scene_registry(n):
+        return build_scene(200, seed=n).world.registry
+
+    results['registry.churn'] = time_calls(scene_registry, churn, repeats, 20)
+    results['registry.filter_type'] = time_calls(scene_registry, lambda r: r.filter_type('BARRIER'), repeats, 200)
+    results['registry.slots'] = time_calls(scene_registry, invalidated_slots, repeats, 200)
+
+    for density in DENSITIES:
+        def scene(n, density=density):
+            return build_scene(density, seed=n)
+
+        def autopilot_scene(n, density=density):
+            running = build_scene(density, seed=n)
+            running.world.autopilot = True
+            return running
+
+        results[f'tick@{density}'] = time_calls(scene, lambda r: r.world.step(sim.SIM_STEP), repeats, 30)
+        results[f'detect_impacts@{density}'] = time_calls(scene, lambda r: r._detect_impacts(), repeats, 30)
+        results[f'godmode@{density}'] = time_calls(autopilot_scene, lambda r: r.godmode(sim.SIM_STEP), repeats, 30)
+        results[f'spawn_more@{density}'] = time_calls(scene, lambda r: r._spawn_more(), repeats, 30)
+
+        def snapshot_scene(n, density=density):
+            running = build_scene(density, seed=n)
+            return running.world, running.world.snapshot()
+
+        results[f'snapshot.take@{density}'] = time_calls(snapshot_scene, lambda s: s[0].snapshot(), repeats, 30)
+        results[f'snapshot.restore@{density}'] = time_calls(snapshot_scene, lambda s: s[0].restore(s[1]), repeats, 30)
+    return results
+
+def import_seconds(module, repeats, env=None):
+    code = (f"import time; start = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - start)")
+    samples = []
+    for n in range(repeats):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                             env={**os.environ, **(env or {})})
+        if out.returncode != 0:
+            return None
+        samples.append(float(out.stdout.split()[-1]))
+    ms = np.array(samples) * 1000
+    return {'median_ms': float(np.median(ms)), 'min_ms': float(ms.min()), 'repeats': repeats, 'number': 1}
+
+def startup_benchmarks(repeats):
+    results = {}
+    for name, module, env in [('startup.import_sim', 'dhaka_sim', None),
+                              ('startup.import_render', 'dhaka_render', None),
+                              ('startup.import_render_production', 'dhaka_render', {'DHAKA_PRODUCTION': '1'})]:
+        row = import_seconds(module, repeats, env)
+        if row:
+            results[name] = row
+    return results
+
+def paint_benchmarks(repeats, backend='stub'):
+    if backend == 'stub':
+        import stubgl
+        recorder = stubgl.install(RENDER)
+        game = importlib.import_module('dhaka_render')
+        game.setup()
+        finish = None
+    else:
+        import dhaka_offscreen
+        recorder = None
+        game = dhaka_offscreen.OffscreenRenderer(backend=backend).game
+        from OpenGL.GL import glFinish as finish
+    results = {}
+
+    for density in DENSITIES:
+        for view in ('THIRD', 'FIRST'):
+            for batched in (True, False):
+                def scene(n, view=view, batched=batched, density=density):
+                    running = build_scene(density, seed=n, world_type=game.World)
+                    running.world.view_mode = view
+                    running.batched = batched
+                    return running
+
+                name = f"paint.{'batched' if batched else 'immediate'}.{view.lower()}@{density}"
+                running = scene(0)
+                running.paint()
+                if recorder is None:
+                    results[name] = time_calls(scene, lambda r: (r.paint(), finish()), repeats, 10)
+                    continue
+                recorder.reset()
+                running.paint()
+                calls = recorder.total()
+                results[name] = time_calls(scene, lambda r: r.paint(), repeats, 10)
+                results[name]['gl_calls'] = calls
+    return results
+
+def frame_totals(results):
+    frames = {}
+    for density in DENSITIES:
+        tick = results.get(f'tick@{density}')
+        paint = results.get(f'paint.batched.third@{density}')
+        if tick and paint:
+            frames[f'frame@{density}'] = tick['median_ms'] + paint['median_ms']
+    return frames
+
+def commit_id():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline, tolerance, floor_ms):
+    regressions = []
+    for name, row in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None:
+            continue
+        delta = row['median_ms'] - old['median_ms']
+        change = delta / old['median_ms'] if old['median_ms'] else 0.0
+        flag = ''
+        if change > tolerance and delta > floor_ms:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<34} {old['median_ms']:>9.3f} {row['median_ms']:>9.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time simulation and paint paths and save the results as JSON.")
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--skip-paint', action='store_true', help="only run the simulation benchmarks")
+    parser.add_argument('--paint-backend', choices=['stub', 'egl', 'osmesa'], default='stub',
+                        help="recording stub GL, or a real offscreen context from dhaka_offscreen")
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help="earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed median slowdown before failing")
+    parser.add_argument('--floor-ms', type=float, default=0.02, help="ignore slowdowns smaller than this")
+    parser.add_argument('--budget-ms', type=float, default=FRAME_BUDGET_MS, help="tick + paint budget per frame")
+    args = parser.parse_args()
+
+    results = sim_benchmarks(args.repeats)
+    results.update(startup_benchmarks(args.repeats))
+    if not args.skip_paint:
+        results.update(paint_benchmarks(args.repeats, args.paint_backend))
+    frames = frame_totals(results)
+
+    print(f"{'benchmark':<34} {'median ms':>9} {'min ms':>9} {'gl calls':>9}")
+    for name, row in results.items():
+        calls = row.get('gl_calls', '')
+        print(f"{name:<34} {row['median_ms']:>9.3f} {row['min_ms']:>9.3f} {calls:>9}")
+    over = [name for name, ms in frames.items() if ms > args.budget_ms]
+    for name, ms in frames.items():
+        print(f"{name:<34} {ms:>9.3f} ms of {args.budget_ms:.1f}{'  OVER BUDGET' if name in over else ''}")
+
+    with open(args.out, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit_id(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'repeats': args.repeats,
+                'paint_backend': args.paint_backend
+            },
+            'results': results,
+            'frames_ms': frames
+        }, f, indent=1)
+    print(f"wrote {args.out}")
+
+    failed = bool(over)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        print(f"\n{'benchmark':<34} {'before':>9} {'after':>9} {'change':>8}")
+        failed |= bool(compare(results, baseline, args.tolerance, args.floor_ms))
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
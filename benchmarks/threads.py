@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dhaka_offscreen
+
+def start(renderer, seed):
+    world = renderer.game.World()
+    world.invincible = True
+    world.autopilot = True
+    world.start_run('Normal', seed)
+    world.timer = time.perf_counter()
+    return world
+
+def tick_log(world):
+    stamps = []
+    step = world.step
+
+    def logged(elapsed):
+        step(elapsed)
+        stamps.append(time.perf_counter())
+
+    world.step = logged
+    return stamps
+
+def single_thread(renderer, seconds, seed):
+    world = start(renderer, seed)
+    stamps = tick_log(world)
+    renderer.world = world
+    frames = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        begin = time.perf_counter()
+        world.update_world()
+        renderer.render()
+        frames.append(time.perf_counter() - begin)
+    return world, frames, stamps
+
+def sim_thread(renderer, seconds, seed):
+    world = start(renderer, seed)
+    stamps = tick_log(world)
+    view = renderer.game.ThreadedView(world)
+    view.sim.start()
+    frames = []
+    gl = renderer.gl
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        begin = time.perf_counter()
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+        view.draw()
+        gl.glFinish()
+        frames.append(time.perf_counter() - begin)
+    view.sim.stop()
+    return world, frames, stamps
+
+def report(name, world, frames, stamps, seconds):
+    gaps = np.diff(stamps) * 1000 if len(stamps) > 1 else np.zeros(1)
+    frame_ms = np.array(frames) * 1000
+    row = {
+        'fps': len(frames) / seconds,
+        'ticks_per_s': len(stamps) / seconds,
+        'frame_p50_ms': float(np.percentile(frame_ms, 50)),
+        'frame_p99_ms': float(np.percentile(frame_ms, 99)),
+        'tick_gap_p99_ms': float(np.percentile(gaps, 99)),
+        'tick_gap_max_ms': float(gaps.max())
+    }
+    print(f"{name:<8} {row['fps']:>7.1f} {row['ticks_per_s']:>8.1f} {row['frame_p50_ms']:>9.2f} "
+          f"{row['frame_p99_ms']:>9.2f} {row['tick_gap_p99_ms']:>9.2f} {row['tick_gap_max_ms']:>9.2f}")
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the single-threaded loop with the simulation thread.")
+    parser.add_argument('--backend', choices=list(dhaka_offscreen.BACKENDS), default='egl')
+    parser.add_argument('--size', type=dhaka_offscreen.parse_size, default=(1600, 900), help="WIDTHxHEIGHT")
+    parser.add_argument('--seconds', type=float, default=10.0, help="wall time per mode")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = args.size
+    renderer = dhaka_offscreen.OffscreenRenderer(width, height, args.backend)
+    print(f"{'mode':<8} {'fps':>7} {'ticks/s':>8} {'frame p50':>9} {'frame p99':>9} {'gap p99':>9} {'gap max':>9}")
+    single = report('single', *single_thread(renderer, args.seconds, args.seed), args.seconds)
+    threaded = report('threaded', *sim_thread(renderer, args.seconds, args.seed), args.seconds)
+    print(f"fps {threaded['fps'] / single['fps']:.2f}x, ticks/s {threaded['ticks_per_s'] / single['ticks_per_s']:.2f}x "
+          f"(target {60.0:.0f})")
+    renderer.release()
+
+if __name__ == "__main__":
+    main()
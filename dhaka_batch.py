@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import dhaka_sim as sim
+
+GAP_KEYS = {'barrier_gap': 'BARRIER', 'treasure_gap': 'TREASURE', 'boost_gap': 'BOOST'}
+DIRECT_KEYS = ('fire_delay', 'bomb_delay', 'autopilot_horizon')
+COLUMNS = {
+    'seed': np.int64,
+    'ticks': np.int32,
+    'survived': np.bool_,
+    'travel': np.float32,
+    'points': np.int32,
+    'defeats': np.int32,
+    'damage': np.int32
+}
+
+def parse_config(text):
+    name, _, body = text.partition(':')
+    overrides = {}
+    for pair in filter(None, body.split(',')):
+        key, _, value = pair.partition('=')
+        if key not in GAP_KEYS and key not in DIRECT_KEYS and key != 'pace':
+            raise argparse.ArgumentTypeError(f"unknown config key: {key}")
+        overrides[key] = float(value)
+    return name, overrides
+
+def build_tuning(overrides, mode):
+    tuning = {}
+    for key, value in overrides.items():
+        if key == 'pace':
+            tuning['mode_speeds'] = {**sim.MODE_SPEEDS, mode: value}
+        elif key in GAP_KEYS:
+            tuning.setdefault('spawn_gaps', dict(sim.SPAWN_GAPS))[GAP_KEYS[key]] = value
+        else:
+            tuning[key] = value
+    return tuning
+
+def run_job(job):
+    index, tuning, seed, mode, max_ticks, step = job
+    result = sim.run_episode(seed, mode=mode, step=step, max_ticks=max_ticks,
+                             autopilot=True, tuning=tuning)
+    return index, tuple(result[name] for name in COLUMNS)
+
+def run_configs(configs, episodes, seed=0, mode='Normal', max_ticks=3600, step=sim.SIM_STEP, workers=None):
+    jobs = [(index, build_tuning(overrides, mode), seed + n, mode, max_ticks, step)
+            for index, (name, overrides) in enumerate(configs)
+            for n in range(episodes)]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(jobs) // (workers * 8))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, values in pool.map(run_job, jobs, chunksize=chunk):
+            rows.append((index,) + values)
+
+    results = {'config': np.array([row[0] for row in rows], dtype=np.int16)}
+    for n, (name, dtype) in enumerate(COLUMNS.items(), start=1):
+        results[name] = np.array([row[n] for row in rows], dtype=dtype)
+    return results
+
+def summarize(results, configs):
+    print(f"{'config':<16} {'runs':>5} {'survived':>9} {'travel':>9} {'p10 trav':>9} "
+          f"{'score':>8} {'kills':>6} {'damage':>7}")
+    for index, (name, overrides) in enumerate(configs):
+        mine = results['config'] == index
+        travel = results['travel'][mine]
+        print(f"{name:<16} {mine.sum():>5} {results['survived'][mine].mean():>9.0%} "
+              f"{travel.mean():>9.1f} {np.percentile(travel, 10):>9.1f} "
+              f"{results['points'][mine].mean():>8.0f} {results['defeats'][mine].mean():>6.1f} "
+              f"{results['damage'][mine].mean():>7.1f}")
+
+def save(path, results, configs, meta):
+    np.savez_compressed(
+        path,
+        names=np.array([name for name, overrides in configs]),
+        overrides=np.array([json.dumps(overrides) for name, overrides in configs]),
+        meta=np.array(json.dumps(meta)),
+        **results
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded autopilot episodes across every core.")
+    parser.add_argument('--episodes', type=int, default=200, help="episodes per config")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', choices=list(sim.MODE_SPEEDS), default='Normal')
+    parser.add_argument('--ticks', type=int, default=3600, help="tick limit per episode")
+    parser.add_argument('--hz', type=float, default=60.0, help="simulation rate")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--config', type=parse_config, action='append', default=[],
+                        help="NAME:key=value,... with keys pace, fire_delay, bomb_delay, "
+                             "autopilot_horizon, barrier_gap, treasure_gap, boost_gap (metres)")
+    parser.add_argument('--out', default='batch_results.npz', help="columnar .npz output")
+    args = parser.parse_args()
+
+    configs = args.config or [('baseline', {})]
+    start = time.perf_counter()
+    results = run_configs(configs, args.episodes, seed=args.seed, mode=args.mode,
+                          max_ticks=args.ticks, step=1 / args.hz, workers=args.workers)
+    spent = time.perf_counter() - start
+
+    summarize(results, configs)
+    runs = len(results['config'])
+    print(f"{runs} episodes in {spent:.1f}s ({runs / spent * 60:.0f} episodes/min)")
+    save(args.out, results, configs, {
+        'mode': args.mode, 'seed': args.seed, 'episodes': args.episodes,
+        'ticks': args.ticks, 'hz': args.hz
+    })
+    print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import ctypes
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+import dhaka_sim as sim
+
+def write_png(path, rgb):
+    height, width, depth = rgb.shape
+    rows = np.zeros((height, width * depth + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 3)))
+        f.write(chunk(b'IEND', b''))
+
+class FrameWriter:
+    def __init__(self, out, fmt='png', backlog=8):
+        self.out = out
+        self.fmt = fmt
+        self.frames = queue.Queue(maxsize=backlog)
+        self.written = 0
+        self.encode_time = 0.0
+        self.error = None
+        if fmt == 'png':
+            os.makedirs(out, exist_ok=True)
+            self.stream = None
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+            self.stream = open(out, 'wb')
+        self.thread = threading.Thread(target=self._encode, name='frame-writer', daemon=True)
+        self.thread.start()
+
+    def put(self, pixels, width, height):
+        if self.error:
+            raise self.error
+        self.frames.put((pixels, width, height))
+
+    def _encode(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            pixels, width, height = item
+            start = time.perf_counter()
+            try:
+                rgb = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)[::-1]
+                if self.stream:
+                    self.stream.write(np.ascontiguousarray(rgb).tobytes())
+                else:
+                    write_png(os.path.join(self.out, f"frame-{self.written:05d}.png"), rgb)
+            except Exception as err:
+                self.error = err
+            self.written += 1
+            self.encode_time += time.perf_counter() - start
+
+    def close(self):
+        self.frames.put(None)
+        self.thread.join()
+        if self.stream:
+            self.stream.close()
+        if self.error:
+            raise self.error
+
+class EGLContext:
+    def __init__(self, width, height):
+        from OpenGL import EGL
+        self.egl = EGL
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("could not initialise EGL")
+        attrs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+            EGL.EGL_BLUE_SIZE, 8, EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE
+        )
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, attrs, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if count.value == 0:
+            raise RuntimeError("no EGL config with a pbuffer and depth buffer")
+        size = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, size)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("could not make the EGL context current")
+
+    def release(self):
+        EGL = self.egl
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglTerminate(self.display)
+
+class OSMesaContext:
+    def __init__(self, width, height):
+        from OpenGL import GL, arrays, osmesa
+        self.osmesa = osmesa
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("could not create an OSMesa context")
+        self.buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL.GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError("could not make the OSMesa context current")
+
+    def release(self):
+        self.osmesa.OSMesaDestroyContext(self.context)
+
+BACKENDS = {'egl': EGLContext, 'osmesa': OSMesaContext}
+
+def select_platform(backend):
+    os.environ.setdefault('PYOPENGL_PLATFORM', backend)
+    if backend == 'egl':
+        os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+    if os.environ['PYOPENGL_PLATFORM'] != backend:
+        raise RuntimeError(f"PYOPENGL_PLATFORM is {os.environ['PYOPENGL_PLATFORM']}, not {backend}")
+
+class OffscreenRenderer:
+    def __init__(self, width=1600, height=900, backend='egl', production=False):
+        self.width, self.height = width, height
+        if production:
+            os.environ['DHAKA_PRODUCTION'] = '1'
+        select_platform(backend)
+        self.context = BACKENDS[backend](width, height)
+        if production:
+            # PyOpenGL's EGL bindings need error checking on to import, and the flags are
+            # frozen by then, so turn it off for the GL entry points that load from here on
+            from OpenGL import _configflags
+            _configflags.ERROR_CHECKING = False
+            _configflags.ERROR_LOGGING = False
+        import dhaka_render
+        self.game = dhaka_render
+        self.game.WIN_W, self.game.WIN_H = width, height
+        self.game.text.enabled = False
+        self.world = self.game.World()
+
+        from OpenGL import GL
+        self.gl = GL
+        GL.glViewport(0, 0, width, height)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        self.game.setup()
+
+    def render(self):
+        GL = self.gl
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        self.world.draw_world()
+        GL.glFinish()
+
+    def read(self):
+        return self.gl.glReadPixels(0, 0, self.width, self.height, self.gl.GL_RGB, self.gl.GL_UNSIGNED_BYTE)
+
+    def release(self):
+        self.game.meshes.release()
+        self.game.text.release()
+        self.context.release()
+
+def capture(renderer, frames, steps_per_frame, writer=None):
+    world = renderer.world
+    step = world.replay.step if world.replay else 1 / world.tick_rate
+    replaying = world.replay is not None
+    render_ms = []
+    for n in range(frames):
+        if world.active_phase_name != 'RUNNING' or replaying and world.replay is None:
+            break
+        for k in range(steps_per_frame):
+            world.step(step)
+            if world.active_phase_name != 'RUNNING' or replaying and world.replay is None:
+                break
+        world.alpha = 1.0
+        start = time.perf_counter()
+        renderer.render()
+        render_ms.append((time.perf_counter() - start) * 1000)
+        if writer:
+            writer.put(renderer.read(), renderer.width, renderer.height)
+    return np.array(render_ms)
+
+def parse_size(text):
+    width, _, height = text.partition('x')
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render Dhaka Dash without a window, for captures and render timings.")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='egl')
+    parser.add_argument('--size', type=parse_size, default=(1600, 900), help="WIDTHxHEIGHT")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=int, default=30, help="capture rate; the simulation stays at its own tick rate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', choices=list(sim.MODE_SPEEDS), default='Normal')
+    parser.add_argument('--view', choices=['THIRD', 'FIRST'], default='THIRD')
+    parser.add_argument('--replay', help="render a recorded .ddr run instead of an autopilot one")
+    parser.add_argument('--format', choices=['png', 'raw'], default='png')
+    parser.add_argument('--out', help="directory for png frames, or a file for raw rgb24 video")
+    parser.add_argument('--profile-dir', help="write per-stage paint timings here when done")
+    parser.add_argument('--production', action='store_true', help="turn off PyOpenGL's per-call error checking")
+    args = parser.parse_args()
+
+    width, height = args.size
+    renderer = OffscreenRenderer(width, height, args.backend, args.production)
+    world = renderer.world
+    world.view_mode = args.view
+    if args.replay:
+        world.play(sim.Replay.load(args.replay))
+    else:
+        world.autopilot = True
+        world.start_run(args.mode, args.seed)
+
+    writer = FrameWriter(args.out, args.format) if args.out else None
+    start = time.perf_counter()
+    render_ms = capture(renderer, args.frames, max(1, round(world.tick_rate / args.fps)), writer)
+    if writer:
+        writer.close()
+    spent = time.perf_counter() - start
+
+    print(f"{len(render_ms)} frames at {width}x{height} in {spent:.1f}s ({len(render_ms) / spent:.1f} fps)")
+    if len(render_ms):
+        p50, p95, p99 = np.percentile(render_ms, [50, 95, 99])
+        print(f"render ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {render_ms.max():.2f}")
+    if writer:
+        print(f"wrote {writer.written} frames to {args.out} (encoder busy {writer.encode_time:.1f}s)")
+        if args.format == 'raw':
+            print(f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {args.fps} -i {args.out} out.mp4")
+    if args.profile_dir:
+        print(f"profile: {world.dump_profile(args.profile_dir)}.json")
+    renderer.release()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,777 @@
+import math
+import os
+import time
+import OpenGL
+if os.environ.get('DHAKA_PRODUCTION'):
+    OpenGL.ERROR_CHECKING = False
+    OpenGL.ERROR_LOGGING = False
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+import random
+from collections import OrderedDict
+import numpy as np
+import dhaka_sim as sim
+from dhaka_sim import LANES, ROAD_W, GRASS_LIMIT
+WIN_W, WIN_H = 1600, 900
+SCENERY_SEED = 1971
+DASH_PERIOD = 6
+LOD_DISTANCE = 70
+
+class MeshCache:
+    def __init__(self):
+        self.lists = {}
+        self.quadric = None
+        self.builders = {
+            'box': self._unit_box,
+            'hero_wheels': lambda: self._wheels(0.65, 0.85, 0.35),
+            'foe_wheels': lambda: self._wheels(0.75, 0.95, 0.4),
+            'shot': lambda: gluSphere(self.quadric, 0.25, 10, 10),
+            'shot_far': lambda: gluSphere(self.quadric, 0.25, 5, 4),
+            'pyramid': lambda: gluCylinder(self.quadric, 0.55, 0, 1.6, 12, 12),
+            'pyramid_far': lambda: gluCylinder(self.quadric, 0.55, 0, 1.6, 6, 1),
+            'ball': lambda: gluSphere(self.quadric, 0.55, 12, 12),
+            'ball_far': lambda: gluSphere(self.quadric, 0.55, 6, 5),
+            'treasure': lambda: gluSphere(self.quadric, 0.45, 14, 14),
+            'treasure_far': lambda: gluSphere(self.quadric, 0.45, 6, 5),
+            'mountain_base': lambda: gluCylinder(self.quadric, 1, 0.35, 1, 16, 16),
+            'mountain_cap': lambda: gluCylinder(self.quadric, 1, 0, 1, 16, 16),
+            'road_strip': self._road_strip
+        }
+    
+    def draw(self, name):
+        glCallList(self.prepare(name))
+    
+    def prepare(self, name):
+        list_id = self.lists.get(name)
+        if list_id is None:
+            list_id = self._compile(name)
+        return list_id
+    
+    def _compile(self, name):
+        if self.quadric is None:
+            self.quadric = gluNewQuadric()
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        self.builders[name]()
+        glEndList()
+        self.lists[name] = list_id
+        return list_id
+    
+    def release(self):
+        for list_id in self.lists.values():
+            glDeleteLists(list_id, 1)
+        self.lists.clear()
+        if self.quadric is not None:
+            gluDeleteQuadric(self.quadric)
+            self.quadric = None
+    
+    def _unit_box(self):
+        h = 0.5
+        glBegin(GL_QUADS)
+        glVertex3f(-h, -h, h); glVertex3f(h, -h, h); glVertex3f(h, h, h); glVertex3f(-h, h, h)
+        glVertex3f(-h, -h, -h); glVertex3f(-h, h, -h); glVertex3f(h, h, -h); glVertex3f(h, -h, -h)
+        glVertex3f(-h, h, -h); glVertex3f(-h, h, h); glVertex3f(h, h, h); glVertex3f(h, h, -h)
+        glVertex3f(-h, -h, -h); glVertex3f(h, -h, -h); glVertex3f(h, -h, h); glVertex3f(-h, -h, h)
+        glVertex3f(h, -h, -h); glVertex3f(h, h, -h); glVertex3f(h, h, h); glVertex3f(h, -h, h)
+        glVertex3f(-h, -h, -h); glVertex3f(-h, -h, h); glVertex3f(-h, h, h); glVertex3f(-h, h, -h)
+        glEnd()
+    
+    def _road_strip(self):
+        near, far = 110 + DASH_PERIOD, -550 - DASH_PERIOD
+        glBegin(GL_QUADS)
+        glColor3f(0.35, 0.35, 0.35)
+        glVertex3f(-ROAD_W/2, 0, near)
+        glVertex3f(ROAD_W/2, 0, near)
+        glVertex3f(ROAD_W/2, 0, far)
+        glVertex3f(-ROAD_W/2, 0, far)
+        
+        glColor3f(1, 0.95, 0.2)
+        for z in range(far, near, DASH_PERIOD):
+            for lx in [LANES[0], LANES[2]]:
+                glVertex3f(lx - 0.12, 0.02, z)
+                glVertex3f(lx + 0.12, 0.02, z)
+                glVertex3f(lx + 0.12, 0.02, z - 3.5)
+                glVertex3f(lx - 0.12, 0.02, z - 3.5)
+        
+        glColor3f(0.25, 0.65, 0.25)
+        glVertex3f(-GRASS_LIMIT, 0, near)
+        glVertex3f(-ROAD_W/2, 0, near)
+        glVertex3f(-ROAD_W/2, 0, far)
+        glVertex3f(-GRASS_LIMIT, 0, far)
+        glVertex3f(ROAD_W/2, 0, near)
+        glVertex3f(GRASS_LIMIT, 0, near)
+        glVertex3f(GRASS_LIMIT, 0, far)
+        glVertex3f(ROAD_W/2, 0, far)
+        glEnd()
+    
+    def _wheels(self, wx, wz, radius):
+        for x, z in [(-wx, -wz), (wx, -wz), (-wx, wz), (wx, wz)]:
+            glPushMatrix()
+            glTranslatef(x, -0.25, z)
+            gluSphere(self.quadric, radius, 12, 12)
+            glPopMatrix()
+
+meshes = MeshCache()
+
+class TextCache:
+    def __init__(self, font=GLUT_BITMAP_HELVETICA_18, capacity=64):
+        self.font = font
+        self.capacity = capacity
+        self.base = None
+        self.lines = OrderedDict()
+        self.enabled = True
+    
+    def draw(self, x, y, msg):
+        if not self.enabled:
+            return
+        glRasterPos2f(x, y)
+        list_id = self.lines.get(msg)
+        if list_id is None:
+            list_id = self._compile(msg)
+        else:
+            self.lines.move_to_end(msg)
+        glCallList(list_id)
+    
+    def _glyphs(self):
+        self.base = glGenLists(128)
+        for code in range(32, 127):
+            glNewList(self.base + code, GL_COMPILE)
+            glutBitmapCharacter(self.font, code)
+            glEndList()
+    
+    def _compile(self, msg):
+        if self.base is None:
+            self._glyphs()
+        if len(self.lines) >= self.capacity:
+            old, list_id = self.lines.popitem(last=False)
+        else:
+            list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        glListBase(self.base)
+        glCallLists(msg.encode('ascii', 'replace'))
+        glEndList()
+        self.lines[msg] = list_id
+        return list_id
+    
+    def release(self):
+        for list_id in self.lines.values():
+            glDeleteLists(list_id, 1)
+        self.lines.clear()
+        if self.base is not None:
+            glDeleteLists(self.base, 128)
+            self.base = None
+
+text = TextCache()
+
+def box_mesh():
+    corners = np.array([[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)], dtype=np.float32)
+    faces = [(1, 5, 7, 3), (0, 2, 6, 4), (2, 3, 7, 6), (0, 4, 5, 1), (4, 6, 7, 5), (0, 1, 3, 2)]
+    return corners[[i for a, b, c, d in faces for i in (a, b, c, a, c, d)]]
+
+def sphere_mesh(slices, stacks):
+    lat = np.linspace(-np.pi / 2, np.pi / 2, stacks + 1)
+    lon = np.linspace(0, 2 * np.pi, slices + 1)
+    ring = np.stack([np.cos(lat)[:, None] * np.cos(lon), np.sin(lat)[:, None] * np.ones_like(lon),
+                     np.cos(lat)[:, None] * np.sin(lon)], axis=-1)
+    a, b = ring[:-1, :-1], ring[:-1, 1:]
+    c, d = ring[1:, 1:], ring[1:, :-1]
+    return np.stack([a, b, c, a, c, d], axis=2).reshape(-1, 3).astype(np.float32)
+
+def cone_mesh(slices):
+    lon = np.linspace(0, 2 * np.pi, slices + 1)
+    ring = np.stack([np.cos(lon), np.zeros_like(lon), np.sin(lon)], axis=-1)
+    apex = np.broadcast_to([0.0, 1.0, 0.0], (slices, 3))
+    return np.stack([ring[:-1], ring[1:], apex], axis=1).reshape(-1, 3).astype(np.float32)
+
+class InstanceBatch:
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.pending = []
+    
+    def add(self, offsets, scales, rgb, yaw=None):
+        count = len(offsets)
+        if count == 0:
+            return
+        scales = np.broadcast_to(np.asarray(scales, dtype=np.float32), (count, 3))
+        rgb = np.broadcast_to(np.asarray(rgb, dtype=np.float32), (count, 3))
+        yaw = np.zeros(count, dtype=np.float32) if yaw is None else np.asarray(yaw, dtype=np.float32)
+        self.pending.append((np.asarray(offsets, dtype=np.float32), scales, rgb, yaw))
+    
+    def flush(self):
+        if not self.pending:
+            return 0
+        offsets, scales, rgb, yaw = (np.concatenate(col) for col in zip(*self.pending))
+        self.pending.clear()
+        
+        verts = self.mesh[None, :, :] * scales[:, None, :]
+        if yaw.any():
+            angle = np.radians(yaw)[:, None]
+            cos, sin = np.cos(angle), np.sin(angle)
+            x, z = verts[:, :, 0].copy(), verts[:, :, 2].copy()
+            verts[:, :, 0] = x * cos + z * sin
+            verts[:, :, 2] = z * cos - x * sin
+        verts += offsets[:, None, :]
+        colours = np.repeat(rgb, len(self.mesh), axis=0)
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(verts, dtype=np.float32))
+        glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(colours))
+        glDrawArrays(GL_TRIANGLES, 0, len(offsets) * len(self.mesh))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        return 1
+
+class SceneryChunks:
+    spacing = 16
+    per_chunk = 8
+    
+    def __init__(self, seed, capacity=16):
+        self.seed = seed
+        self.capacity = capacity
+        self.lists = OrderedDict()
+    
+    def draw(self, hero_z):
+        start = int(hero_z / -self.spacing) - 12
+        first = start // self.per_chunk
+        last = (start + 54) // self.per_chunk
+        
+        for chunk in [c for c in self.lists if c < first]:
+            glDeleteLists(self.lists.pop(chunk), 1)
+        
+        for chunk in range(first, last + 1):
+            list_id = self.lists.get(chunk)
+            if list_id is None:
+                list_id = self._compile(chunk)
+            else:
+                self.lists.move_to_end(chunk)
+            glCallList(list_id)
+        
+        while len(self.lists) > self.capacity:
+            glDeleteLists(self.lists.popitem(last=False)[1], 1)
+    
+    def peaks(self, chunk):
+        rng = random.Random(f"{self.seed}:{chunk}")
+        for side in [-38, 38]:
+            for i in range(chunk * self.per_chunk, (chunk + 1) * self.per_chunk):
+                yield side, i * -self.spacing, 20 + rng.randrange(14), 8 + rng.randrange(5)
+    
+    def _compile(self, chunk):
+        meshes.prepare('mountain_base')
+        meshes.prepare('mountain_cap')
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        for side, mz, h, r in self.peaks(chunk):
+            snow = h * 0.7
+            
+            glPushMatrix()
+            glTranslatef(side, 0, mz)
+            glColor3f(0.45, 0.38, 0.32)
+            glRotatef(-90, 1, 0, 0)
+            glScalef(r, r, snow)
+            meshes.draw('mountain_base')
+            glPopMatrix()
+            
+            glPushMatrix()
+            glTranslatef(side, snow, mz)
+            glColor3f(0.98, 0.98, 0.98)
+            glRotatef(-90, 1, 0, 0)
+            glScalef(r * 0.35, r * 0.35, h - snow)
+            meshes.draw('mountain_cap')
+            glPopMatrix()
+        glEndList()
+        self.lists[chunk] = list_id
+        return list_id
+    
+    def release(self):
+        for list_id in self.lists.values():
+            glDeleteLists(list_id, 1)
+        self.lists.clear()
+
+scenery = SceneryChunks(SCENERY_SEED)
+
+batches = {
+    'box': InstanceBatch(box_mesh()),
+    'sphere': InstanceBatch(sphere_mesh(12, 12)),
+    'sphere_far': InstanceBatch(sphere_mesh(6, 5)),
+    'cone': InstanceBatch(cone_mesh(12)),
+    'cone_far': InstanceBatch(cone_mesh(6))
+}
+
+class Frustum:
+    def __init__(self):
+        self.planes = None
+    
+    def update(self):
+        modelview = np.array(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4)
+        projection = np.array(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4, 4)
+        clip = (modelview @ projection).T
+        planes = np.array([clip[3] + clip[0], clip[3] - clip[0], clip[3] + clip[1],
+                           clip[3] - clip[1], clip[3] + clip[2], clip[3] - clip[2]])
+        self.planes = planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+    
+    def visible(self, pos, radius):
+        if self.planes is None or len(pos) == 0:
+            return np.ones(len(pos), dtype=bool)
+        dist = pos @ self.planes[:, :3].T + self.planes[:, 3]
+        return (dist >= -np.reshape(radius, (-1, 1))).all(axis=1)
+
+class Menu(sim.Menu):
+    def paint(self):
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, WIN_W, 0, WIN_H)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        
+        self._paint_string(WIN_W//2 - 120, WIN_H//2 + 110, "DHAKA DASH", (0, 0, 0))
+        self._paint_string(WIN_W//2 - 160, WIN_H//2, f"MODE: {self.mode_choice}", (0.95, 0.95, 0.95))
+        self._paint_string(WIN_W//2 - 260, WIN_H//2 - 55, "1=Easy / 2=Normal / 3=Hard", (0.95, 0.95, 0.95))
+        self._paint_string(WIN_W//2 - 160, WIN_H//2 - 110, "TAB to begin", (0.95, 0.95, 0.95))
+        
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+    
+    def _paint_string(self, x, y, msg, rgb):
+        glColor3f(*rgb)
+        text.draw(x, y, msg)
+
+class Running(sim.Running):
+    batched = True
+    
+    def __init__(self, world):
+        super().__init__(world)
+        self.profile_lines = []
+        self.profile_age = 0
+        self.hud_values = None
+        self.hud_lines = []
+        self.frustum = Frustum()
+        self.eye = np.zeros(3)
+        self.culled = (0, 0)
+    
+    def paint(self):
+        prof = self.world.profiler
+        self.px, self.py, self.pz = self.world.registry.store.blend(self.world.alpha)
+        self.particle_pos = self.world.particles.blend(self.world.alpha)
+        with prof.stage('configure_view'):
+            self._configure_view()
+        with prof.stage('paint_world'):
+            self._paint_world()
+        with prof.stage('paint_objects'):
+            self._paint_objects()
+        with prof.stage('paint_overlay'):
+            self._paint_overlay()
+    
+    def _position(self, obj):
+        return self.px[obj.slot], self.py[obj.slot], self.pz[obj.slot]
+    
+    def _configure_view(self):
+        glLoadIdentity()
+        hero_x, hero_y, hero_z = self._position(self.world.hero)
+        
+        if self.world.view_mode == 'FIRST':
+            gluLookAt(hero_x, hero_y + 1.3, hero_z, 
+                     hero_x, hero_y + 1.3, hero_z - 110, 
+                     0, 1, 0)
+            self.eye = np.array([hero_x, hero_y + 1.3, hero_z])
+        else:
+            gluLookAt(hero_x, 7.5, hero_z + 18, 
+                     hero_x, 1, hero_z - 8, 
+                     0, 1, 0)
+            self.eye = np.array([hero_x, 7.5, hero_z + 18])
+        self.frustum.update()
+    
+    def _paint_world(self):
+        hero_z = self._position(self.world.hero)[2]
+        
+        glPushMatrix()
+        glTranslatef(0, 0, math.floor(hero_z / DASH_PERIOD) * DASH_PERIOD)
+        meshes.draw('road_strip')
+        glPopMatrix()
+        
+        scenery.draw(hero_z)
+    
+    def _paint_objects(self):
+        self._paint_hero()
+        self.culled = (0, 0)
+        
+        if self.batched:
+            self._paint_batched()
+            return
+        
+        idx, pos, foes, far = self._visible('FOE')
+        for foe in foes:
+            self._paint_foe(foe)
+        
+        idx, pos, shots, far = self._visible('SHOT')
+        for shot, lod in zip(shots, far):
+            self._paint_shot(shot, lod)
+        
+        idx, pos, barriers, far = self._visible('BARRIER')
+        for barrier, lod in zip(barriers, far):
+            self._paint_barrier(barrier, lod)
+        
+        for item_type in ['TREASURE', 'BOOST']:
+            idx, pos, items, far = self._visible(item_type)
+            for item, lod in zip(items, far):
+                self._paint_item(item, item_type, lod)
+        
+        particles = self.world.particles
+        glColor3f(*particles.rgb)
+        for pos in self._visible_particles():
+            glPushMatrix()
+            glTranslatef(*pos)
+            self._render_box(particles.size)
+            glPopMatrix()
+    
+    def _visible(self, obj_type):
+        registry = self.world.registry
+        idx = registry.slots(obj_type)
+        pos = np.column_stack((self.px[idx], self.py[idx], self.pz[idx]))
+        objs = [registry.items[slot] for slot in idx]
+        if not objs:
+            return idx, pos, objs, np.zeros(0, dtype=bool)
+        dims = np.array([obj.fetch('visuals').dimensions for obj in objs])
+        keep = self.frustum.visible(pos, 0.75 * np.linalg.norm(dims, axis=1))
+        self._count_culled(len(objs), keep.sum())
+        idx, pos = idx[keep], pos[keep]
+        objs = [obj for obj, shown in zip(objs, keep) if shown]
+        far = ((pos - self.eye) ** 2).sum(axis=1) > LOD_DISTANCE ** 2
+        return idx, pos, objs, far
+    
+    def _visible_particles(self):
+        pos = self.particle_pos
+        keep = self.frustum.visible(pos, self.world.particles.size)
+        self._count_culled(len(pos), keep.sum())
+        return pos[keep]
+    
+    def _count_culled(self, total, shown):
+        seen, culled = self.culled
+        self.culled = (seen + total, culled + total - int(shown))
+    
+    def _paint_batched(self):
+        store = self.world.registry.store
+        box, sphere, cone = batches['box'], batches['sphere'], batches['cone']
+        
+        def spheres(pos, far, scale, rgb):
+            rgb = np.asarray(rgb, dtype=np.float32)
+            if rgb.ndim == 2:
+                sphere.add(pos[~far], scale, rgb[~far])
+                batches['sphere_far'].add(pos[far], scale, rgb[far])
+            else:
+                sphere.add(pos[~far], scale, rgb)
+                batches['sphere_far'].add(pos[far], scale, rgb)
+        
+        idx, pos, foes, far = self._visible('FOE')
+        if foes:
+            vis = [foe.fetch('visuals') for foe in foes]
+            rgb = np.array([v.rgb for v in vis], dtype=np.float32)
+            box.add(pos, [v.dimensions for v in vis], rgb)
+            box.add(pos + (0, 0.55, -0.25), (1.05, 0.55, 1.25), rgb * 0.6)
+            for wx, wz in [(-0.75, -0.95), (0.75, -0.95), (-0.75, 0.95), (0.75, 0.95)]:
+                spheres(pos + (wx, -0.25, wz), far, 0.4, (0.12, 0.12, 0.12))
+        
+        idx, pos, shots, far = self._visible('SHOT')
+        if shots:
+            spheres(pos, far, 0.25, [shot.fetch('visuals').rgb for shot in shots])
+        
+        idx, pos, barriers, far = self._visible('BARRIER')
+        shapes = np.array([barrier.shape_type for barrier in barriers])
+        cubes = np.nonzero(shapes == 'CUBE')[0]
+        box.add(pos[cubes], 1.6, [barriers[i].fetch('visuals').rgb for i in cubes])
+        pyramids = shapes == 'PYRAMID'
+        cone.add(pos[pyramids & ~far], (0.55, 1.6, 0.55), (1, 0.6, 0.1))
+        batches['cone_far'].add(pos[pyramids & far], (0.55, 1.6, 0.55), (1, 0.6, 0.1))
+        balls = shapes == 'BALL'
+        spheres(pos[balls], far[balls], 0.55, (0.35, 0.35, 0.35))
+        
+        idx, pos, treasures, far = self._visible('TREASURE')
+        if treasures:
+            spheres(pos, far, 0.45, [item.fetch('visuals').rgb for item in treasures])
+        
+        idx, pos, boosts, far = self._visible('BOOST')
+        box.add(pos, 1.3, [item.fetch('visuals').rgb for item in boosts], store.spin[idx])
+        box.add(pos, 0.65, (1, 0.95, 0.2), store.spin[idx])
+        
+        particles = self.world.particles
+        box.add(self._visible_particles(), particles.size, particles.rgb)
+        
+        for batch in batches.values():
+            batch.flush()
+    
+    def _paint_hero(self):
+        pos = self._position(self.world.hero)
+        vis = self.world.hero.fetch('visuals')
+        
+        if self.world.view_mode == 'FIRST':
+            glPushMatrix()
+            glTranslatef(*pos)
+            glColor3f(*vis.rgb)
+            glPushMatrix()
+            glTranslatef(0, 0.85, -1.6)
+            glScalef(1.1, 0.25, 0.9)
+            self._render_box(1)
+            glPopMatrix()
+            glPopMatrix()
+            return
+        
+        glPushMatrix()
+        glTranslatef(*pos)
+        glColor3f(*vis.rgb)
+        glPushMatrix()
+        glScalef(*vis.dimensions)
+        self._render_box(1)
+        glPopMatrix()
+        
+        glColor3f(0.35, 0.65, 1.05)
+        glPushMatrix()
+        glTranslatef(0, 0.55, -0.35)
+        glScalef(0.95, 0.55, 1.05)
+        self._render_box(1)
+        glPopMatrix()
+        
+        glColor3f(0.15, 0.15, 0.15)
+        meshes.draw('hero_wheels')
+        glPopMatrix()
+    
+    def _paint_foe(self, foe):
+        pos = self._position(foe)
+        vis = foe.fetch('visuals')
+        
+        glPushMatrix()
+        glTranslatef(*pos)
+        glColor3f(*vis.rgb)
+        glPushMatrix()
+        glScalef(*vis.dimensions)
+        self._render_box(1)
+        glPopMatrix()
+        
+        shade = tuple(c * 0.6 for c in vis.rgb)
+        glColor3f(*shade)
+        glPushMatrix()
+        glTranslatef(0, 0.55, -0.25)
+        glScalef(1.05, 0.55, 1.25)
+        self._render_box(1)
+        glPopMatrix()
+        
+        glColor3f(0.12, 0.12, 0.12)
+        meshes.draw('foe_wheels')
+        glPopMatrix()
+    
+    def _paint_shot(self, shot, far=False):
+        pos = self._position(shot)
+        vis = shot.fetch('visuals')
+        
+        glPushMatrix()
+        glTranslatef(*pos)
+        glColor3f(*vis.rgb)
+        meshes.draw('shot_far' if far else 'shot')
+        glPopMatrix()
+    
+    def _paint_barrier(self, barrier, far=False):
+        pos = self._position(barrier)
+        vis = barrier.fetch('visuals')
+        
+        glPushMatrix()
+        glTranslatef(*pos)
+        
+        if barrier.shape_type == 'CUBE':
+            glColor3f(*vis.rgb)
+            self._render_box(1.6)
+        elif barrier.shape_type == 'PYRAMID':
+            glColor3f(1, 0.6, 0.1)
+            glRotatef(-90, 1, 0, 0)
+            meshes.draw('pyramid_far' if far else 'pyramid')
+        elif barrier.shape_type == 'BALL':
+            glColor3f(0.35, 0.35, 0.35)
+            meshes.draw('ball_far' if far else 'ball')
+        
+        glPopMatrix()
+    
+    def _paint_item(self, item, item_type, far=False):
+        trans = item.fetch('transform')
+        pos = self._position(item)
+        vis = item.fetch('visuals')
+        
+        glPushMatrix()
+        glTranslatef(*pos)
+        glRotatef(trans.spin, 0, 1, 0)
+        glColor3f(*vis.rgb)
+        
+        if item_type == 'TREASURE':
+            meshes.draw('treasure_far' if far else 'treasure')
+        else:
+            self._render_box(1.3)
+            glColor3f(1, 0.95, 0.2)
+            glScalef(0.65, 0.65, 0.65)
+            self._render_box(1)
+        
+        glPopMatrix()
+    
+    def _render_box(self, scale):
+        if scale == 1:
+            meshes.draw('box')
+            return
+        glPushMatrix()
+        glScalef(scale, scale, scale)
+        meshes.draw('box')
+        glPopMatrix()
+    
+    def _paint_overlay(self):
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, WIN_W, 0, WIN_H)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        
+        stats = self.world.stats
+        values = (int(self.world.hero.fetch('vitality').val), int(stats['points']), int(stats['travel']),
+                  int(stats['pace']), stats['defeats'], self.world.view_mode, self.world.invincible)
+        if values != self.hud_values:
+            self.hud_values = values
+            self.hud_lines = self._hud_lines(*values)
+        
+        for y, msg, rgb in self.hud_lines:
+            glColor3f(*rgb)
+            self._display_info(15, y, msg)
+        
+        if self.world.show_profile:
+            self._paint_profile()
+        
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+    
+    def _hud_lines(self, hp, points, travel, pace, defeats, view_mode, invincible):
+        white = (0.95, 0.95, 0.95)
+        view_label = "FIRST PERSON" if view_mode == 'FIRST' else "THIRD PERSON"
+        lines = [
+            (WIN_H - 35, f"HP: {hp}", white),
+            (WIN_H - 65, f"SCORE: {points}", white),
+            (WIN_H - 95, f"DIST: {travel} meters", white),
+            (WIN_H - 125, f"SPEED: {pace} km/h", white),
+            (WIN_H - 155, f"KILLS: {defeats}", white),
+            (WIN_H - 185, f"CAM: {view_label}", white)
+        ]
+        if invincible:
+            lines.append((WIN_H - 215, "GOD MODE ACTIVE", (1, 0.2, 0.2)))
+        lines.append((55, "Arrow Keys: Lane | I/RMB: Fire | K/LMB: Bomb | V: Camera | G: God Mode | P: Profiler", white))
+        return lines
+    
+    def _paint_profile(self):
+        if self.profile_age == 0:
+            self.profile_lines = ["STAGE: p50 / p95 / p99 ms"] + [
+                f"{name}: {row['p50_ms']:.2f} / {row['p95_ms']:.2f} / {row['p99_ms']:.2f}"
+                for name, row in self.world.profiler.summary().items()
+            ] + [f"culled: {self.culled[1]} / {self.culled[0]} entities"] + [
+                f"pool {name}: {row['live']} live / {row['free']} free / peak {row['high_water']}"
+                for name, row in self.world.registry.pool_stats().items()
+            ]
+        self.profile_age = (self.profile_age + 1) % 30
+        
+        glColor3f(1, 1, 0.4)
+        for n, line in enumerate(self.profile_lines):
+            self._display_info(WIN_W - 460, WIN_H - 35 - n * 26, line)
+        glColor3f(0.95, 0.95, 0.95)
+    
+    def _display_info(self, x, y, msg):
+        text.draw(x, y, msg)
+
+class Finished(sim.Finished):
+    def paint(self):
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, WIN_W, 0, WIN_H)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        
+        glColor3f(1, 0.2, 0.2)
+        self._display_info(WIN_W//2 - 85, WIN_H//2 + 55, "WRECKED")
+        
+        glColor3f(0.95, 0.95, 0.95)
+        self._display_info(WIN_W//2 - 105, WIN_H//2, 
+                         f"Final Score: {int(self.world.stats['points'])}")
+        self._display_info(WIN_W//2 - 125, WIN_H//2 - 35, 
+                         f"Enemies Destroyed: {self.world.stats['defeats']}")
+        self._display_info(WIN_W//2 - 125, WIN_H//2 - 75, 
+                         "Press Q to restart menu")
+        if self.world.checkpoints:
+            self._display_info(WIN_W//2 - 125, WIN_H//2 - 110,
+                             "Press R to resume from a checkpoint")
+        if self.world.scores:
+            self._paint_leaders(self.world.scores)
+        
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+    
+    def _paint_leaders(self, scores):
+        mode = self.world.mode
+        last = scores.last
+        y = WIN_H//2 - 160
+        if last and last['mode'] == mode and last['rank'] and last['rank'] <= scores.top:
+            glColor3f(1, 0.85, 0.2)
+            self._display_info(WIN_W//2 - 125, y, f"New #{last['rank']} on the {mode} board!")
+            y -= 35
+        glColor3f(0.95, 0.95, 0.95)
+        self._display_info(WIN_W//2 - 125, y, f"Best {mode} runs")
+        for n, (run_id, points, travel, defeats, finished) in enumerate(scores.leaders.get(mode, ()), start=1):
+            mine = last is not None and last['id'] == run_id
+            if mine:
+                glColor3f(1, 0.85, 0.2)
+            else:
+                glColor3f(0.8, 0.8, 0.8)
+            self._display_info(WIN_W//2 - 125, y - 30 * n, f"{n}. {points:>6}   {travel:.0f} m")
+    
+    def _display_info(self, x, y, msg):
+        text.draw(x, y, msg)
+    
+class World(sim.World):
+    phase_types = {
+        'MENU': Menu,
+        'RUNNING': Running,
+        'FINISHED': Finished
+    }
+
+class ThreadedView:
+    def __init__(self, world):
+        self.world = world
+        self.mirror = World()
+        self.mirror.profiler = world.profiler
+        self.sim = sim.SimThread(world)
+        self.ticks = None
+    
+    def draw(self):
+        frame = self.sim.frame
+        if frame is None:
+            return
+        phase, ticks, stamp, data = frame
+        if data is None:
+            self.world.phases[phase].paint()
+            return
+        mirror = self.mirror
+        if ticks != self.ticks:
+            mirror.restore(data)
+            self.ticks = ticks
+        mirror.show_profile = self.world.show_profile
+        mirror.alpha = min(1.0, (time.perf_counter() - stamp) * self.world.tick_rate)
+        mirror.draw_world()
+
+def setup():
+    glClearColor(0.56, 0, 1, 1)
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(65, WIN_W / WIN_H, 0.1, 520.0)
+    glMatrixMode(GL_MODELVIEW)
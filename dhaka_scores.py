@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.dhaka_dash', 'scores.db')
+COLUMNS = ('finished', 'mode', 'seed', 'points', 'travel', 'defeats', 'damage', 'ticks', 'survived', 'assisted')
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished TEXT,
+    mode TEXT,
+    seed INTEGER,
+    points INTEGER,
+    travel REAL,
+    defeats INTEGER,
+    damage INTEGER,
+    ticks INTEGER,
+    survived INTEGER,
+    assisted INTEGER,
+    stages TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_points ON runs (mode, assisted, points DESC);
+"""
+
+def connect(path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+def leaders(db, mode, top):
+    return db.execute(
+        "SELECT id, points, travel, defeats, finished FROM runs WHERE mode = ? AND NOT assisted "
+        "ORDER BY points DESC, id LIMIT ?", (mode, top)
+    ).fetchall()
+
+class ScoreStore:
+    def __init__(self, path=DEFAULT_PATH, top=5):
+        self.path = path
+        self.top = top
+        self.runs = queue.Queue()
+        self.leaders = {}
+        self.last = None
+        self.written = 0
+        self.error = None
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._write, name='score-store', daemon=True)
+        self.thread.start()
+
+    def submit(self, run):
+        self.last = None
+        if not self.thread.is_alive():
+            if not self.dropped:
+                print(f"[SCORES] not saving runs to {self.path}: {self.error}")
+            self.dropped += 1
+            return
+        self.runs.put(run)
+
+    def _write(self):
+        try:
+            db = connect(self.path)
+            self._refresh(db)
+        except (sqlite3.Error, OSError) as err:
+            self.error = err
+            return
+        while True:
+            run = self.runs.get()
+            if run is None:
+                break
+            try:
+                with db:
+                    cursor = db.execute(
+                        f"INSERT INTO runs ({', '.join(COLUMNS)}, stages) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                        [run[name] for name in COLUMNS] + [json.dumps(run['stages'])]
+                    )
+                rank = None
+                if not run['assisted']:
+                    rank = db.execute("SELECT COUNT(*) + 1 FROM runs WHERE mode = ? AND NOT assisted AND points > ?",
+                                      (run['mode'], run['points'])).fetchone()[0]
+                self._refresh(db)
+                self.last = {'id': cursor.lastrowid, 'mode': run['mode'], 'rank': rank}
+                self.written += 1
+            except sqlite3.Error as err:
+                self.error = err
+        db.close()
+
+    def _refresh(self, db):
+        modes = [mode for mode, in db.execute("SELECT DISTINCT mode FROM runs")]
+        self.leaders = {mode: leaders(db, mode, self.top) for mode in modes}
+
+    def close(self):
+        self.runs.put(None)
+        self.thread.join()
+        if self.error:
+            raise self.error
+
+class FileWriter:
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._write, name='file-writer', daemon=True)
+        self.thread.start()
+
+    def put(self, save, *args):
+        self.jobs.put((save, args))
+
+    def _write(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            save, args = job
+            try:
+                save(*args)
+                self.written += 1
+            except OSError as err:
+                self.error = err
+                print(f"[FILES] {err}")
+
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join()
+        if self.error:
+            raise self.error
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the Dhaka Dash leaderboard and recent run telemetry.")
+    parser.add_argument('--db', default=os.environ.get('DHAKA_SCORES', DEFAULT_PATH))
+    parser.add_argument('--mode', default='Normal')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--recent', type=int, default=10, help="recent runs to list with their frame times")
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    print(f"{args.mode} leaderboard")
+    for n, (run_id, points, travel, defeats, finished) in enumerate(leaders(db, args.mode, args.top), start=1):
+        print(f"{n:>3}. {points:>7}  {travel:>8.1f} m  {defeats:>4} kills  {finished}")
+
+    print(f"\n{'run':>5} {'mode':<7} {'seed':>10} {'points':>7} {'travel':>8} {'ticks':>6} "
+          f"{'sim p99':>8} {'paint p50':>9} {'paint p99':>9}")
+    for run_id, mode, seed, points, travel, ticks, assisted, stages in db.execute(
+            "SELECT id, mode, seed, points, travel, ticks, assisted, stages FROM runs ORDER BY id DESC LIMIT ?",
+            (args.recent,)):
+        stages = json.loads(stages)
+        sim = stages.get('update_world', stages.get('step', {}))
+        paint = stages.get('draw_world', {})
+        times = [f"{row[k]:.2f}" if k in row else '-' for row, k in
+                 ((sim, 'p99_ms'), (paint, 'p50_ms'), (paint, 'p99_ms'))]
+        print(f"{run_id:>5} {mode:<7} {seed:>10} {points:>7} {travel:>8.1f} {ticks:>6} "
+              f"{times[0]:>8} {times[1]:>9} {times[2]:>9}{'  assisted' if assisted else ''}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
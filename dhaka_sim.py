@@ -0,0 +1,1662 @@
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import random
+import struct
+import threading
+import time
+from collections import deque
+import numpy as np
+LANES = [-7.5, 0.0, 7.8]
+ROAD_W = 21
+GRASS_LIMIT = 105
+FIRE_DELAY = 0.25
+BOMB_DELAY = 0.9
+SIM_STEP = 1 / 60
+KEY_LEFT = 100
+KEY_RIGHT = 102
+MODE_SPEEDS = {"Easy": 17, "Normal": 22, "Hard": 50}
+SPAWN_GAPS = {'BARRIER': 14.7, 'TREASURE': 20.4, 'BOOST': 36.7}
+SPAWN_CURVES = {
+    'Easy': [(0, 1.3), (500, 0.74), (1500, 0.48), (4000, 0.31)],
+    'Normal': [(0, 1.0), (500, 0.67), (1500, 0.46), (4000, 0.3)],
+    'Hard': [(0, 0.44), (500, 0.4), (1500, 0.34), (4000, 0.26)]
+}
+SPAWN_AHEAD = 100
+SHOT_ORIGINS = {'HERO': 0, 'FOE': 1}
+LANE_X = np.array(LANES)
+LANE_EDGES = [(LANES[0] + LANES[1]) / 2, (LANES[1] + LANES[2]) / 2]
+TUNING_KEYS = ('fire_delay', 'bomb_delay', 'autopilot_horizon', 'mode_speeds', 'spawn_gaps', 'spawn_curves')
+EVENT_KEY, EVENT_KEY_UP, EVENT_SPECIAL, EVENT_MOUSE = range(4)
+POOL_SIZES = {'FOE': 16, 'SHOT': 96, 'BARRIER': 40, 'TREASURE': 24, 'BOOST': 16}
+FOE_SIZE = (1.4, 0.75, 2.3)
+BARRIER_SIZE = (1.6, 1.6, 1.6)
+ITEM_SIZES = {'TREASURE': (0.9, 0.9, 0.9), 'BOOST': (1.3, 1.3, 1.3)}
+ITEM_COLOURS = {'TREASURE': (1, 0.95, 0.2), 'BOOST': (1, 0.25, 0.1)}
+SHOT_SIZE = (0.5, 0.5, 0.5)
+SHOT_COLOURS = {'HERO': (1, 1, 0.2), 'FOE': (1, 0.4, 0.1)}
+
+class Transform:
+    __slots__ = ('x', 'y', 'z', 'current_lane', 'desired_lane')
+    
+    def __init__(self, x=0, y=0, z=0):
+        self.x, self.y, self.z = x, y, z
+        self.current_lane = 1
+        self.desired_lane = 1
+
+class Health:
+    __slots__ = ('max_val', 'val', 'alive')
+    
+    def __init__(self, max_val):
+        self.max_val = max_val
+        self.val = max_val
+        self.alive = True
+    
+    def damage(self, amt):
+        self.val = max(0, self.val - amt)
+        self.alive = self.val > 0
+        return self.alive
+    
+    def restore(self, amt):
+        self.val = min(self.max_val, self.val + amt)
+
+class Ammonation:
+    __slots__ = ('fire_time', 'bomb_time', 'ready')
+    
+    def __init__(self):
+        self.fire_time = 0
+        self.bomb_time = 0
+        self.ready = True
+
+class Motion:
+    __slots__ = ('vx', 'vy', 'vz')
+    
+    def __init__(self, vx=0, vy=0, vz=0):
+        self.vx, self.vy, self.vz = vx, vy, vz
+
+class Visuals:
+    __slots__ = ('rgb', 'dimensions', 'show')
+    
+    def __init__(self, rgb=(0, 0, 0), dimensions=(1, 1, 1)):
+        self.rgb = list(rgb)
+        self.dimensions = dimensions
+        self.show = True
+    
+    def put(self, rgb, dimensions):
+        self.rgb[:] = rgb
+        self.dimensions = dimensions
+        self.show = True
+        return self
+    
+    def load(self, part):
+        self.put(part.rgb, part.dimensions)
+
+class ComponentStore:
+    columns = {
+        'x': np.float64, 'y': np.float64, 'z': np.float64,
+        'px': np.float64, 'py': np.float64, 'pz': np.float64,
+        'vx': np.float64, 'vy': np.float64, 'vz': np.float64,
+        'tx': np.float64, 'spin': np.float64,
+        'fire_clock': np.float64, 'hp': np.float64, 'hp_max': np.float64,
+        'lane': np.int8, 'cur_lane': np.int8, 'origin': np.int8,
+        'kind': np.int16, 'alive': np.bool_
+    }
+    
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        for name, dtype in self.columns.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+    
+    def reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in self.columns.items():
+            grown = np.zeros(capacity, dtype=dtype)
+            grown[:self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.capacity = capacity
+    
+    def reset(self, slot):
+        for name in self.columns:
+            getattr(self, name)[slot] = 0
+    
+    def save_previous(self):
+        np.copyto(self.px, self.x)
+        np.copyto(self.py, self.y)
+        np.copyto(self.pz, self.z)
+    
+    def blend(self, alpha):
+        return (self.px + (self.x - self.px) * alpha,
+                self.py + (self.y - self.py) * alpha,
+                self.pz + (self.z - self.pz) * alpha)
+
+def _column(name):
+    def get(self):
+        return getattr(self.store, name)[self.slot]
+    
+    def put(self, value):
+        getattr(self.store, name)[self.slot] = value
+    
+    return property(get, put)
+
+class TransformView:
+    __slots__ = ('store', 'slot')
+    x = _column('x')
+    y = _column('y')
+    z = _column('z')
+    target_x = _column('tx')
+    spin = _column('spin')
+    current_lane = _column('cur_lane')
+    desired_lane = _column('lane')
+    
+    def __init__(self, store, slot):
+        self.store, self.slot = store, slot
+    
+    def put(self, x, y, z, lane=1):
+        store, slot = self.store, self.slot
+        store.x[slot] = store.px[slot] = x
+        store.y[slot] = store.py[slot] = y
+        store.z[slot] = store.pz[slot] = z
+        store.cur_lane[slot] = store.lane[slot] = lane
+        return self
+    
+    def load(self, part):
+        self.put(part.x, part.y, part.z)
+        self.current_lane = part.current_lane
+        self.desired_lane = part.desired_lane
+
+class MotionView:
+    __slots__ = ('store', 'slot')
+    vx = _column('vx')
+    vy = _column('vy')
+    vz = _column('vz')
+    
+    def __init__(self, store, slot):
+        self.store, self.slot = store, slot
+    
+    def put(self, vx, vy, vz):
+        self.vx, self.vy, self.vz = vx, vy, vz
+        return self
+    
+    def load(self, part):
+        self.put(part.vx, part.vy, part.vz)
+
+class HealthView:
+    __slots__ = ('store', 'slot')
+    val = _column('hp')
+    max_val = _column('hp_max')
+    
+    def __init__(self, store, slot):
+        self.store, self.slot = store, slot
+    
+    @property
+    def alive(self):
+        return self.val > 0
+    
+    def put(self, max_val):
+        self.max_val = self.val = max_val
+        return self
+    
+    def load(self, part):
+        self.max_val = part.max_val
+        self.val = part.val
+    
+    def damage(self, amt):
+        self.val = max(0, self.val - amt)
+        return self.alive
+    
+    def restore(self, amt):
+        self.val = min(self.max_val, self.val + amt)
+
+class GObject:
+    __slots__ = ('id', 'obj_type', 'parts', 'enabled', 'slot', 'views', 'shape_type')
+    next_id = 0
+    
+    def __init__(self, obj_type, store=None, slot=0):
+        self.id = GObject.next_id
+        GObject.next_id += 1
+        self.obj_type = obj_type
+        self.parts = {}
+        self.enabled = True
+        self.slot = slot
+        self.shape_type = None
+        self.views = {'visuals': Visuals()}
+        if store is not None:
+            self.views.update({
+                'transform': TransformView(store, slot),
+                'motion': MotionView(store, slot),
+                'vitality': HealthView(store, slot)
+            })
+    
+    def use(self, part_name):
+        view = self.parts[part_name] = self.views[part_name]
+        return view
+    
+    def attach(self, part_name, part):
+        view = self.views.get(part_name)
+        if view is not None:
+            view.load(part)
+            part = view
+        self.parts[part_name] = part
+        return self
+    
+    def fetch(self, part_name):
+        return self.parts.get(part_name)
+
+class Objectreg:
+    def __init__(self, sizes=POOL_SIZES):
+        self.items = []
+        self.unused = {}
+        self.live = {}
+        self.counts = {}
+        self.high_water = {}
+        self.pending = []
+        self.store = ComponentStore(sum(sizes.values()) + 1)
+        self.kinds = {}
+        self.slot_cache = {}
+        for obj_type, size in sizes.items():
+            self.unused[obj_type] = [self._allocate(obj_type) for n in range(size)]
+            self.live[obj_type] = []
+    
+    def _allocate(self, obj_type):
+        self.store.reserve(len(self.items) + 1)
+        obj = GObject(obj_type, self.store, len(self.items))
+        obj.enabled = False
+        self.items.append(obj)
+        return obj
+    
+    def create(self, obj_type):
+        pool = self.unused.get(obj_type)
+        obj = pool.pop() if pool else self._allocate(obj_type)
+        obj.enabled = True
+        self.store.reset(obj.slot)
+        self.store.kind[obj.slot] = self.kinds.setdefault(obj_type, len(self.kinds) + 1)
+        self.store.alive[obj.slot] = True
+        self.slot_cache.pop(obj_type, None)
+        self.live.setdefault(obj_type, []).append(obj)
+        count = self.counts[obj_type] = self.counts.get(obj_type, 0) + 1
+        if count > self.high_water.get(obj_type, 0):
+            self.high_water[obj_type] = count
+        return obj
+    
+    def remove(self, obj):
+        if not obj.enabled:
+            return
+        obj.enabled = False
+        obj.parts.clear()
+        self.store.alive[obj.slot] = False
+        self.slot_cache.pop(obj.obj_type, None)
+        self.counts[obj.obj_type] -= 1
+        self.pending.append(obj)
+    
+    def flush(self):
+        if not self.pending:
+            return
+        for obj_type in {o.obj_type for o in self.pending}:
+            self.live[obj_type][:] = [o for o in self.live[obj_type] if o.enabled]
+        for obj in self.pending:
+            self.unused.setdefault(obj.obj_type, []).append(obj)
+        self.pending.clear()
+    
+    def slots(self, obj_type):
+        idx = self.slot_cache.get(obj_type)
+        if idx is None:
+            n = len(self.items)
+            code = self.kinds.get(obj_type, 0)
+            idx = np.nonzero(self.store.alive[:n] & (self.store.kind[:n] == code))[0]
+            self.slot_cache[obj_type] = idx
+        return idx
+    
+    def each(self, obj_type):
+        objs = self.live.get(obj_type)
+        if not objs:
+            return
+        for i in range(len(objs)):
+            obj = objs[i]
+            if obj.enabled:
+                yield obj
+    
+    def count(self, obj_type):
+        return self.counts.get(obj_type, 0)
+    
+    def filter_type(self, obj_type):
+        return list(self.each(obj_type))
+    
+    def all_active(self):
+        return [o for objs in self.live.values() for o in objs if o.enabled]
+    
+    def pool_stats(self):
+        return {
+            obj_type: {
+                'live': self.counts.get(obj_type, 0),
+                'free': len(self.unused.get(obj_type, ())),
+                'high_water': self.high_water.get(obj_type, 0)
+            }
+            for obj_type in self.live
+        }
+
+class ParticleSystem:
+    def __init__(self, capacity=1024, gravity=22, rgb=(0.85, 0.25, 0.25), size=0.35):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.rgb = rgb
+        self.size = size
+        self.pos = np.zeros((capacity, 3))
+        self.prev = np.zeros((capacity, 3))
+        self.vel = np.zeros((capacity, 3))
+        self.life = np.zeros(capacity)
+        self.count = 0
+    
+    def emit(self, origin, velocities, life):
+        n = min(len(velocities), self.capacity - self.count)
+        if n <= 0:
+            return 0
+        live = slice(self.count, self.count + n)
+        self.pos[live] = origin
+        self.prev[live] = origin
+        self.vel[live] = velocities[:n]
+        self.life[live] = life
+        self.count += n
+        return n
+    
+    def update(self, elapsed):
+        n = self.count
+        if not n:
+            return
+        self.life[:n] -= elapsed
+        keep = self.life[:n] > 0
+        if not keep.all():
+            n = self.count = int(keep.sum())
+            for column in (self.pos, self.vel, self.life):
+                column[:n] = column[:len(keep)][keep]
+        
+        self.prev[:n] = self.pos[:n]
+        self.pos[:n] += self.vel[:n] * elapsed
+        self.vel[:n, 1] -= self.gravity * elapsed
+    
+    def blend(self, alpha):
+        n = self.count
+        return self.prev[:n] + (self.pos[:n] - self.prev[:n]) * alpha
+    
+    def clear(self):
+        self.count = 0
+
+class LaneGrid:
+    def __init__(self, cell):
+        self.cell = cell
+        self.buckets = {}
+    
+    def clear(self):
+        self.buckets.clear()
+    
+    def insert(self, slot, x, z):
+        key = (lane_of(x), math.floor(z / self.cell))
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = []
+        bucket.append(slot)
+    
+    def build(self, slots, xs, zs):
+        self.clear()
+        for slot, x, z in zip(slots, xs, zs):
+            self.insert(slot, x, z)
+    
+    def query(self, x, z, radius):
+        first = math.floor((z - radius) / self.cell)
+        last = math.floor((z + radius) / self.cell)
+        for lane in range(len(LANES)):
+            if lane > 0 and x + radius <= LANE_EDGES[lane - 1]:
+                continue
+            if lane < len(LANE_EDGES) and x - radius >= LANE_EDGES[lane]:
+                continue
+            for cell in range(first, last + 1):
+                bucket = self.buckets.get((lane, cell))
+                if bucket:
+                    yield from bucket
+
+def lane_of(x):
+    if x < LANE_EDGES[0]:
+        return 0
+    return 1 if x < LANE_EDGES[1] else 2
+
+class SpawnScheduler:
+    def __init__(self, gaps, curve, rng, start_z):
+        self.gaps = gaps
+        self.curve = curve
+        self.rng = rng
+        self.origin = start_z
+        self.queue = []
+        for obj_type in sorted(gaps):
+            self._schedule(obj_type, start_z)
+    
+    def density(self, z):
+        distance = self.origin - z
+        prev_d, prev_f = self.curve[0]
+        if distance <= prev_d:
+            return prev_f
+        for d, f in self.curve[1:]:
+            if distance < d:
+                return prev_f + (f - prev_f) * (distance - prev_d) / (d - prev_d)
+            prev_d, prev_f = d, f
+        return prev_f
+    
+    def _schedule(self, obj_type, z):
+        gap = self.gaps[obj_type]
+        if gap <= 0:
+            return
+        z -= self.rng.expovariate(self.density(z) / gap)
+        heapq.heappush(self.queue, (-z, obj_type))
+    
+    def due(self, horizon_z):
+        while self.queue and -self.queue[0][0] >= horizon_z:
+            key, obj_type = heapq.heappop(self.queue)
+            self._schedule(obj_type, -key)
+            yield obj_type, -key
+
+class StageTimer:
+    __slots__ = ('profiler', 'name', 'start')
+    
+    def __init__(self, profiler, name):
+        self.profiler, self.name = profiler, name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+class Profiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.timers = {}
+        self.rings = {}
+        self.counts = {}
+    
+    def stage(self, name):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = StageTimer(self, name)
+        return timer
+    
+    def record(self, name, seconds):
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = np.zeros(self.capacity)
+        count = self.counts.get(name, 0)
+        ring[count % self.capacity] = seconds
+        self.counts[name] = count + 1
+    
+    def reset(self):
+        self.rings.clear()
+        self.counts.clear()
+    
+    def samples(self, name):
+        ring = self.rings.get(name)
+        count = self.counts.get(name, 0)
+        if ring is None or not count:
+            return np.zeros(0)
+        if count <= self.capacity:
+            return ring[:count]
+        return np.roll(ring, -(count % self.capacity))
+    
+    def summary(self):
+        report = {}
+        for name in list(self.rings):
+            ms = self.samples(name) * 1000
+            if not len(ms):
+                continue
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            report[name] = {
+                'count': len(ms),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(ms.max())
+            }
+        return report
+    
+    def report(self, **extra):
+        return {
+            'summary': self.summary(),
+            'samples_ms': {name: (self.samples(name) * 1000).round(4).tolist() for name in list(self.rings)},
+            **extra
+        }
+
+class InputQueue:
+    def __init__(self):
+        self.events = deque()
+    
+    def push(self, kind, code, extra=0, x=0, y=0):
+        self.events.append((time.perf_counter(), kind, code, extra, x, y))
+    
+    def drain(self):
+        events = self.events
+        batch = []
+        while events:
+            batch.append(events.popleft())
+        return batch
+
+class Replay:
+    MAGIC = b'DDRP'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHQBBdH')
+    EVENT = struct.Struct('<IBBBhh')
+    FOOTER = struct.Struct('<II20s')
+    
+    def __init__(self, seed, mode, flags=0, tuning=None, step=SIM_STEP):
+        self.seed = seed
+        self.mode = mode
+        self.flags = flags
+        self.tuning = tuning or {}
+        self.step = step
+        self.events = []
+        self.ticks = 0
+        self.digest = b''
+        self.cursor = 0
+    
+    def record(self, tick, kind, code, extra=0, x=0, y=0):
+        self.events.append((tick, kind, code, extra, x, y))
+    
+    def due(self, tick):
+        while self.cursor < len(self.events) and self.events[self.cursor][0] <= tick:
+            self.cursor += 1
+            yield self.events[self.cursor - 1]
+    
+    def save(self, path):
+        tuning = json.dumps(self.tuning, sort_keys=True).encode()
+        modes = list(MODE_SPEEDS)
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, modes.index(self.mode),
+                                     self.flags, self.step, len(tuning)))
+            f.write(tuning)
+            f.write(self.FOOTER.pack(len(self.events), self.ticks, self.digest))
+            f.write(b''.join(self.EVENT.pack(*event) for event in self.events))
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, mode, flags, step, size = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} replay")
+        at = cls.HEADER.size
+        replay = cls(seed, list(MODE_SPEEDS)[mode], flags, json.loads(data[at:at + size]), step)
+        at += size
+        count, replay.ticks, replay.digest = cls.FOOTER.unpack_from(data, at)
+        at += cls.FOOTER.size
+        replay.events = list(cls.EVENT.iter_unpack(data[at:at + count * cls.EVENT.size]))
+        return replay
+
+class Snapshot:
+    MAGIC = b'DDSN'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHIdII')
+    PARTS = {'transform': 1, 'motion': 2, 'vitality': 4, 'visuals': 8}
+    SHAPES = (None, 'CUBE', 'PYRAMID', 'BALL')
+
+    @classmethod
+    def layout(cls, slots, meta):
+        for name, dtype in ComponentStore.columns.items():
+            yield name, dtype, slots
+        yield 'pools', np.int32, slots
+        yield 'parts', np.uint8, slots
+        yield 'shape', np.int8, slots
+        yield 'show', np.bool_, slots
+        yield 'look', np.float64, slots * 6
+        yield 'spawn_key', np.float64, len(meta['spawns'])
+        yield 'particles', np.float64, meta['particles'] * 10
+        yield 'rng', np.uint32, 625
+
+    @classmethod
+    def take(cls, world):
+        if world.active_phase_name != 'RUNNING':
+            raise ValueError("snapshots can only be taken during a run")
+        registry = world.registry
+        registry.flush()
+        running = world.phases['RUNNING']
+        slots = len(registry.items)
+        types = list(registry.live)
+        arm = world.hero.fetch('armament')
+        version, state, gauss = world.rng.getstate()
+        meta = {
+            'seed': world.seed,
+            'mode': world.mode,
+            'view_mode': world.view_mode,
+            'invincible': world.invincible,
+            'autopilot': world.autopilot,
+            'tuning': {name: getattr(world, name) for name in TUNING_KEYS},
+            'stats': world.stats,
+            'pools': [(t, len(registry.live[t]), len(registry.unused.get(t, ()))) for t in types],
+            'kinds': list(registry.kinds),
+            'counts': registry.counts,
+            'high_water': registry.high_water,
+            'hero': world.hero.slot,
+            'armament': (arm.fire_time, arm.bomb_time, arm.ready),
+            'spawn_origin': running.spawns.origin,
+            'spawns': [obj_type for key, obj_type in running.spawns.queue],
+            'particles': world.particles.count,
+            'gauss': gauss
+        }
+
+        arrays = {name: getattr(registry.store, name)[:slots] for name in ComponentStore.columns}
+        arrays['pools'] = [o.slot for t in types for o in registry.live[t] + registry.unused.get(t, [])]
+        live = [obj for t in types for obj in registry.live[t]]
+        index = [obj.slot for obj in live]
+        visuals = [obj.views['visuals'] for obj in live]
+        shapes = {shape: n for n, shape in enumerate(cls.SHAPES)}
+        for name, dtype, value in (
+                ('parts', np.uint8, [sum(cls.PARTS.get(name, 0) for name in obj.parts) for obj in live]),
+                ('shape', np.int8, [shapes[obj.shape_type] for obj in live]),
+                ('show', np.bool_, [vis.show for vis in visuals]),
+                ('look', np.float64, [[*vis.rgb, *vis.dimensions] for vis in visuals])):
+            column = arrays[name] = np.zeros((slots, 6) if name == 'look' else slots, dtype)
+            column[index] = value
+        arrays['spawn_key'] = [key for key, obj_type in running.spawns.queue]
+        particles = world.particles
+        n = particles.count
+        arrays['particles'] = np.concatenate((particles.pos[:n], particles.prev[:n], particles.vel[:n],
+                                              particles.life[:n, None]), axis=1)
+        arrays['rng'] = state
+
+        body = json.dumps(meta).encode()
+        chunks = [cls.HEADER.pack(cls.MAGIC, cls.VERSION, world.ticks, world.clock, slots, len(body)), body]
+        for name, dtype, count in cls.layout(slots, meta):
+            chunks.append(np.asarray(arrays[name], dtype=dtype).tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def read(cls, data):
+        magic, version, ticks, clock, slots, size = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"not a version {cls.VERSION} snapshot")
+        at = cls.HEADER.size
+        meta = json.loads(data[at:at + size])
+        at += size
+        arrays = {}
+        for name, dtype, count in cls.layout(slots, meta):
+            arrays[name] = np.frombuffer(data, dtype, count, at)
+            at += arrays[name].nbytes
+        return ticks, clock, slots, meta, arrays
+
+    @classmethod
+    def restore(cls, world, data):
+        ticks, clock, slots, meta, arrays = cls.read(data)
+        for name, value in meta['tuning'].items():
+            setattr(world, name, value)
+        world.seed = meta['seed']
+        world.mode = meta['mode']
+        world.view_mode = meta['view_mode']
+        world.invincible = meta['invincible']
+        world.autopilot = meta['autopilot']
+        world.stats.update(meta['stats'])
+        world.ticks, world.clock = ticks, clock
+
+        arm = world.hero.fetch('armament') if world.hero else None
+        registry = world.registry
+        order = arrays['pools'].tolist()
+        slot_types = [None] * slots
+        at = 0
+        for obj_type, live, free in meta['pools']:
+            for slot in order[at:at + live + free]:
+                slot_types[slot] = obj_type
+            at += live + free
+        while len(registry.items) < slots:
+            registry._allocate(slot_types[len(registry.items)])
+        del registry.items[slots:]
+        store = registry.store
+        for name in ComponentStore.columns:
+            getattr(store, name)[:slots] = arrays[name]
+        items = registry.items
+        for obj, obj_type in zip(items, slot_types):
+            obj.obj_type = obj_type
+            obj.enabled = False
+            obj.parts.clear()
+
+        registry.live.clear()
+        registry.unused.clear()
+        at = 0
+        for obj_type, live, free in meta['pools']:
+            registry.live[obj_type] = [items[slot] for slot in order[at:at + live]]
+            registry.unused[obj_type] = [items[slot] for slot in order[at + live:at + live + free]]
+            at += live + free
+
+        live = [obj for objs in registry.live.values() for obj in objs]
+        index = [obj.slot for obj in live]
+        parts, shapes, shows = (arrays[name][index].tolist() for name in ('parts', 'shape', 'show'))
+        look = arrays['look'].reshape(slots, 6)[index].tolist()
+        names = {mask: [name for name, bit in cls.PARTS.items() if mask & bit] for mask in set(parts)}
+        for obj, mask, shape, show, row in zip(live, parts, shapes, shows, look):
+            obj.enabled = True
+            views, used = obj.views, obj.parts
+            for name in names[mask]:
+                used[name] = views[name]
+            obj.shape_type = cls.SHAPES[shape]
+            vis = views['visuals']
+            vis.rgb[:] = row[:3]
+            vis.dimensions = tuple(row[3:])
+            vis.show = show
+        registry.kinds = {obj_type: n for n, obj_type in enumerate(meta['kinds'], start=1)}
+        registry.counts = meta['counts']
+        registry.high_water = meta['high_water']
+        registry.pending.clear()
+        registry.slot_cache.clear()
+
+        world.hero = items[meta['hero']]
+        if arm is None:
+            arm = Ammonation()
+        arm.fire_time, arm.bomb_time, arm.ready = meta['armament']
+        world.hero.parts['armament'] = arm
+
+        n = meta['particles']
+        rows = arrays['particles'].reshape(n, 10)
+        particles = world.particles
+        particles.pos[:n], particles.prev[:n], particles.vel[:n] = rows[:, 0:3], rows[:, 3:6], rows[:, 6:9]
+        particles.life[:n] = rows[:, 9]
+        particles.count = n
+
+        running = world.phases['RUNNING']
+        running.foe_grid.clear()
+        spawns = running.spawns
+        if spawns is None:
+            spawns = running.spawns = SpawnScheduler({}, world.spawn_curves[world.mode], world.rng, 0.0)
+        spawns.gaps = world.spawn_gaps
+        spawns.curve = world.spawn_curves[world.mode]
+        spawns.rng = world.rng
+        spawns.origin = meta['spawn_origin']
+        spawns.queue[:] = zip(arrays['spawn_key'].tolist(), meta['spawns'])
+        world.rng.setstate((3, tuple(arrays['rng'].tolist()), meta['gauss']))
+
+        if world.active_phase is not running:
+            world.active_phase.on_exit()
+            world.active_phase_name = 'RUNNING'
+            world.active_phase = running
+        world.recording = None
+        if world.replay:
+            world.replay.cursor = sum(1 for event in world.replay.events if event[0] < ticks)
+        world.accumulator = 0.0
+        world.timer = time.perf_counter()
+
+def unique_path(directory, suffix):
+    os.makedirs(directory, exist_ok=True)
+    stem = base = os.path.join(directory, time.strftime('run-%Y%m%d-%H%M%S'))
+    n = 1
+    while os.path.exists(base + suffix):
+        base = f"{stem}-{n}"
+        n += 1
+    return base
+
+def save_profile(directory, report):
+    base = unique_path(directory, '.json')
+    with open(base + '.json', 'w') as f:
+        json.dump(report, f, indent=1)
+    columns = ['count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['stage'] + columns)
+        for name, row in report['summary'].items():
+            writer.writerow([name] + [row[c] if c == 'count' else f"{row[c]:.4f}" for c in columns])
+    return base
+
+def save_replay(directory, replay):
+    path = unique_path(directory, '.ddr') + '.ddr'
+    replay.save(path)
+    return path
+
+class Phase:
+    def __init__(self, world):
+        self.world = world
+    
+    def on_enter(self):
+        pass
+    
+    def on_exit(self):
+        pass
+    
+    def tick(self, elapsed):
+        pass
+    
+    def paint(self):
+        pass
+
+class Menu(Phase):
+    def on_enter(self):
+        self.mode_choice = "Normal"
+    
+    def tick(self, elapsed):
+        pass
+    
+    def process_key(self, key):
+        if key == b'\t':
+            return 'RUNNING'
+        elif key == b'1':
+            self.mode_choice = "Easy"
+        elif key == b'2':
+            self.mode_choice = "Normal"
+        elif key == b'3':
+            self.mode_choice = "Hard"
+        return None
+
+class Running(Phase):
+    def __init__(self, world):
+        super().__init__(world)
+        self.foe_grid = LaneGrid(4.0)
+        self.spawns = None
+    
+    def on_enter(self):
+        self.build_world()
+    
+    def build_world(self):
+        self.world.registry = Objectreg()
+        self.world.particles.clear()
+        self.foe_grid.clear()
+        self.spawns = SpawnScheduler(self.world.spawn_gaps, self.world.spawn_curves[self.world.mode],
+                                     self.world.rng, -SPAWN_AHEAD)
+        hero = self.world.registry.create('HERO')
+        hero.attach('transform', Transform(0, 0.5, 0))
+        hero.attach('vitality', Health(100))
+        hero.attach('armament', Ammonation())
+        hero.attach('visuals', Visuals((0.25, 0.55, 0.95), [1.3, 0.65, 2.1]))
+        self.world.hero = hero
+        
+        for i in range(6):
+            self._create_foe(-80 - i * 80)
+        for i in range(18):
+            self._create_barrier(-45 - i * 32)
+            if i % 2 == 1:
+                self._create_item('TREASURE', -35 - i * 48)
+            if i % 3 == 0:
+                self._create_item('BOOST', -70 - i * 65)
+    
+    def _create_foe(self, z_val):
+        rng = self.world.rng
+        foe = self.world.registry.create('FOE')
+        trans = foe.use('transform').put(rng.choice(LANES), 0.6, z_val)
+        foe.use('vitality').put(50)
+        foe.use('motion').put(0, 0, rng.uniform(5, 10))
+        
+        rgb = foe.use('visuals').put((0, 0, 0), FOE_SIZE).rgb
+        rgb[0] = rng.uniform(0.75, 1.0)
+        rgb[1] = rng.uniform(0.0, 0.25)
+        rgb[2] = rng.uniform(0.0, 0.25)
+        trans.target_x = rng.choice(LANES)
+        return foe
+    
+    def _create_barrier(self, z_val):
+        barrier = self.world.registry.create('BARRIER')
+        lane = self.world.rng.choice(LANES)
+        barrier.shape_type = self.world.rng.choice(('CUBE', 'PYRAMID', 'BALL'))
+        barrier.use('transform').put(lane, 0.5, z_val)
+        barrier.use('visuals').put((0.65, 0.45, 0.25), BARRIER_SIZE)
+    
+    def _create_item(self, item_type, z_val):
+        item = self.world.registry.create(item_type)
+        y_val = 1.0 if item_type == 'TREASURE' else 1.3
+        item.use('transform').put(self.world.rng.choice(LANES), y_val, z_val)
+        item.use('visuals').put(ITEM_COLOURS[item_type], ITEM_SIZES[item_type])
+    
+    def godmode(self, elapsed):
+        if not (self.world.invincible or self.world.autopilot):
+            return
+
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        hero_arm = self.world.hero.fetch('armament')
+        hero_x, hero_z = hero_trans.x, hero_trans.z
+
+        hazards = np.concatenate((registry.slots('BARRIER'), registry.slots('FOE')))
+        gaps, in_lane, ahead = self._lane_profile(hazards, hero_z - self.world.autopilot_horizon, hero_z)
+
+        is_foe = store.kind[ahead] == registry.kinds.get('FOE')
+        in_sight = is_foe & (np.abs(store.x[ahead] - hero_x) < 2.0) & (gaps < 30)
+        if in_sight.any() and self.world.clock - hero_arm.fire_time > self.world.fire_delay:
+            self._launch_shot([hero_x, hero_trans.y + 0.6, hero_z - 2.5], 'HERO')
+            hero_arm.fire_time = self.world.clock
+
+        threat = (in_lane / gaps[:, None]).sum(axis=0)
+        occupied = in_lane.any(axis=0)
+        best_lane = int(np.argmin(threat))
+        current = int(hero_trans.desired_lane)
+
+        if occupied[current] and best_lane != current:
+            if gaps[in_lane[:, current]].max() < 15:
+                hero_trans.desired_lane = best_lane
+
+        items = np.concatenate((registry.slots('TREASURE'), registry.slots('BOOST')))
+        gaps, in_lane, ahead = self._lane_profile(items, hero_z - 20, hero_z + 5)
+        lane = np.argmax(in_lane, axis=1)
+        wanted = in_lane.any(axis=1) & (~occupied[lane] | (np.abs(gaps) < 8))
+        if wanted.any():
+            hero_trans.desired_lane = int(lane[np.nonzero(wanted)[0][-1]])
+
+    def _lane_profile(self, slots, near_z, far_z):
+        store = self.world.registry.store
+        hero_z = self.world.hero.fetch('transform').z
+        z = store.z[slots]
+        ahead = slots[(z > near_z) & (z < far_z)]
+        in_lane = np.abs(store.x[ahead][:, None] - LANE_X) < 1.5
+        return hero_z - store.z[ahead], in_lane, ahead
+    
+    def tick(self, elapsed):
+        self.world.stats['travel'] += self.world.stats['pace'] * elapsed
+        self.world.stats['pace'] += 0.6 * elapsed
+
+        hero_trans = self.world.hero.fetch('transform')
+        hero_trans.z -= self.world.stats['pace'] * elapsed
+
+        prof = self.world.profiler
+        with prof.stage('godmode'):
+            self.godmode(elapsed)
+
+        target_x = LANES[hero_trans.desired_lane]
+        if hero_trans.x < target_x:
+            hero_trans.x = min(hero_trans.x + 22 * elapsed, target_x)
+        elif hero_trans.x > target_x:
+            hero_trans.x = max(hero_trans.x - 22 * elapsed, target_x)
+
+        with prof.stage('process_foes'):
+            self._process_foes(elapsed)
+        with prof.stage('process_shots'):
+            self._process_shots(elapsed)
+        with prof.stage('process_items'):
+            self._process_items(elapsed)
+        with prof.stage('particles'):
+            self.world.particles.update(elapsed)
+        with prof.stage('detect_impacts'):
+            self._detect_impacts()
+        with prof.stage('spawn_more'):
+            self._spawn_more()
+
+        self.world.registry.flush()
+
+        hero_vit = self.world.hero.fetch('vitality')
+        if self.world.invincible:
+            hero_vit.val = hero_vit.max_val
+
+        if not hero_vit.alive:
+            return 'FINISHED'
+
+        return None
+    
+    def _process_foes(self, elapsed):
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        hero_x, hero_z = hero_trans.x, hero_trans.z
+        
+        idx = registry.slots('FOE')
+        ease = 6 * elapsed
+        z = store.z[idx] + store.vz[idx] * elapsed
+        x = store.x[idx] + np.clip(store.tx[idx] - store.x[idx], -ease, ease)
+        store.z[idx] = z
+        store.x[idx] = x
+        
+        gone = z > hero_z + 35
+        for slot in idx[gone]:
+            registry.remove(registry.items[slot])
+            self._create_foe(hero_z - 100)
+        
+        firing = ~gone & (np.abs(z - hero_z) < 25) & (np.abs(x - hero_x) > 3.5)
+        firing &= self.world.clock - store.fire_clock[idx] > 2.2
+        for slot in idx[firing]:
+            self._launch_shot([store.x[slot], store.y[slot], store.z[slot]], 'FOE')
+            store.fire_clock[slot] = self.world.clock
+    
+    def _process_shots(self, elapsed):
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        
+        idx = registry.slots('SHOT')
+        mine = store.origin[idx] == SHOT_ORIGINS['HERO']
+        vz = store.vz[idx]
+        z = store.z[idx] + np.where(mine, -vz, vz * 0.55) * elapsed
+        dx = hero_trans.x - store.x[idx]
+        homing = ~mine & (np.abs(dx) > 0.6)
+        store.z[idx] = z
+        store.x[idx] += np.where(homing, np.sign(dx) * 12 * elapsed, 0)
+        
+        for slot in idx[np.abs(z - hero_trans.z) > 220]:
+            registry.remove(registry.items[slot])
+    
+    def _process_items(self, elapsed):
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        
+        for item_type, turn_rate in (('TREASURE', 200), ('BOOST', 140)):
+            idx = registry.slots(item_type)
+            store.spin[idx] += turn_rate * elapsed
+            for slot in idx[store.z[idx] > hero_trans.z + 25]:
+                registry.remove(registry.items[slot])
+    
+    def _detect_impacts(self):
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        hero_vit = self.world.hero.fetch('vitality')
+        hero_pos = (hero_trans.x, hero_trans.z)
+
+        shots = registry.slots('SHOT')
+        shots = shots[store.origin[shots] == SHOT_ORIGINS['HERO']]
+        grid = self.foe_grid
+        if len(shots):
+            foes = registry.slots('FOE')
+            grid.build(foes.tolist(), store.x[foes].tolist(), store.z[foes].tolist())
+        for slot, shot_x, shot_z in zip(shots.tolist(), store.x[shots].tolist(), store.z[shots].tolist()):
+            for foe_slot in grid.query(shot_x, shot_z, 2.2):
+                if not store.alive[foe_slot]:
+                    continue
+                if not self._near((shot_x, shot_z), (store.x[foe_slot], store.z[foe_slot]), 2.2):
+                    continue
+                foe = registry.items[foe_slot]
+                if not foe.fetch('vitality').damage(50):
+                    f_trans = foe.fetch('transform')
+                    self.world.stats['points'] += 110
+                    self.world.stats['defeats'] += 1
+                    self._make_fragments([f_trans.x, f_trans.y, f_trans.z])
+                    registry.remove(foe)
+                    spawned = self._create_foe(hero_pos[1] - 100)
+                    grid.insert(spawned.slot, store.x[spawned.slot], store.z[spawned.slot])
+
+                registry.remove(registry.items[slot])
+                break
+
+        for slot in self._near_hero('SHOT', 1.8):
+            if store.origin[slot] == SHOT_ORIGINS['FOE']:
+                if not self.world.invincible:
+                    hero_vit.damage(12)
+                    self.world.stats['damage'] += 12
+                registry.remove(registry.items[slot])
+
+        for item_type in ['TREASURE', 'BOOST']:
+            for slot in self._near_hero(item_type, 1.7):
+                if item_type == 'TREASURE':
+                    self.world.stats['points'] += 55
+                else:
+                    item_z = store.z[slot]
+                    for foe in registry.each('FOE'):
+                        f_trans = foe.fetch('transform')
+                        if abs(f_trans.z - item_z) < 55:
+                            self.world.stats['points'] += 110
+                            self.world.stats['defeats'] += 1
+                            self._make_fragments([f_trans.x, f_trans.y, f_trans.z])
+                            registry.remove(foe)
+                            self._create_foe(hero_pos[1] - 100)
+
+                registry.remove(registry.items[slot])
+
+        for slot in self._near_hero('BARRIER', 1.7):
+            if not self.world.invincible:
+                hero_vit.damage(18)
+                self.world.stats['damage'] += 18
+            registry.remove(registry.items[slot])
+
+    def _near_hero(self, obj_type, limit):
+        registry = self.world.registry
+        store = registry.store
+        hero_trans = self.world.hero.fetch('transform')
+        idx = registry.slots(obj_type)
+        dx = store.x[idx] - hero_trans.x
+        dz = store.z[idx] - hero_trans.z
+        return idx[dx * dx + dz * dz < limit * limit]
+
+    def _near(self, pos1, pos2, limit):
+        dx = pos1[0] - pos2[0]
+        dz = pos1[1] - pos2[1]
+        return dx*dx + dz*dz < limit*limit
+    
+    def _launch_shot(self, coords, origin):
+        shot = self.world.registry.create('SHOT')
+        shot.use('transform').put(coords[0], coords[1], coords[2])
+        shot.use('motion').put(0, 0, 110 if origin == 'HERO' else 65)
+        shot.use('visuals').put(SHOT_COLOURS[origin], SHOT_SIZE)
+        self.world.registry.store.origin[shot.slot] = SHOT_ORIGINS[origin]
+    
+    def _make_fragments(self, coords):
+        velocities = [(self.world.rng.uniform(-6, 6), self.world.rng.uniform(3, 9), self.world.rng.uniform(-6, 6)) for k in range(9)]
+        self.world.particles.emit(coords, velocities, 0.6)
+    
+    def _spawn_more(self):
+        hero_z = self.world.hero.fetch('transform').z
+        
+        if self.world.registry.count('FOE') == 0:
+            self._create_foe(hero_z - 60)
+        
+        for obj_type, z_val in self.spawns.due(hero_z - SPAWN_AHEAD):
+            if obj_type == 'BARRIER':
+                self._create_barrier(z_val)
+            else:
+                self._create_item(obj_type, z_val)
+
+class Finished(Phase):
+    def process_key(self, key):
+        if key in (b'q', b'Q'):
+            return 'MENU'
+        if key in (b'r', b'R') and self.world.checkpoints:
+            return 'RUNNING'
+        return None
+
+class World:
+    phase_types = {
+        'MENU': Menu,
+        'RUNNING': Running,
+        'FINISHED': Finished
+    }
+
+    def __init__(self):
+        self.clock = 0.0
+        self.phases = {name: cls(self) for name, cls in self.phase_types.items()}
+        self.active_phase_name = 'MENU'
+        self.active_phase = self.phases['MENU']
+        self.active_phase.on_enter()
+        
+        self.inputs = InputQueue()
+        self.key_states = {}
+        self.mouse_states = {}
+        self.fire_requested = False
+        self.bomb_requested = False
+        self.timer = time.perf_counter()
+        self.tick_rate = 60
+        self.max_catchup = 5
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        
+        self.seed = None
+        self.mode = None
+        self.rng = random.Random()
+        self.ticks = 0
+        self.recording = None
+        self.replay = None
+        self.replay_ok = None
+        self.replay_dir = None
+        self.checkpoints = deque(maxlen=3)
+        self.checkpoint_every = 0
+        self.scores = None
+        self.files = None
+        self.assisted = False
+        
+        self.view_mode = 'THIRD'
+        self.invincible = False
+        self.autopilot = False
+        self.autopilot_horizon = 35
+        self.fire_delay = FIRE_DELAY
+        self.bomb_delay = BOMB_DELAY
+        self.mode_speeds = dict(MODE_SPEEDS)
+        self.spawn_gaps = dict(SPAWN_GAPS)
+        self.spawn_curves = dict(SPAWN_CURVES)
+        
+        self.stats = {
+            'points': 0,
+            'pace': 22.0,
+            'travel': 0.0,
+            'defeats': 0,
+            'damage': 0
+        }
+        
+        self.registry = Objectreg()
+        self.particles = ParticleSystem()
+        self.hero = None
+        
+        self.profiler = Profiler()
+        self.show_profile = False
+        self.profile_dir = None
+        self.startup = {}
+    
+    def switch_phase(self, phase_name):
+        if phase_name in self.phases:
+            if phase_name == 'FINISHED':
+                if self.profile_dir:
+                    self.dump_profile(self.profile_dir)
+                self.submit_score(False)
+                self.close_recording()
+                self.check_replay()
+            self.active_phase.on_exit()
+            self.active_phase_name = phase_name
+            self.active_phase = self.phases[phase_name]
+            self.active_phase.on_enter()
+    
+    def close_recording(self):
+        if self.recording:
+            self.recording.ticks = self.ticks
+            self.recording.digest = self.digest()
+            if self.replay_dir:
+                self.write_file(save_replay, self.replay_dir, self.recording)
+            self.recording = None
+    
+    def submit_score(self, survived):
+        if self.scores and not self.replay:
+            self.scores.submit({
+                'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'mode': self.mode,
+                'seed': self.seed,
+                'points': int(self.stats['points']),
+                'travel': float(self.stats['travel']),
+                'defeats': int(self.stats['defeats']),
+                'damage': int(self.stats['damage']),
+                'ticks': self.ticks,
+                'survived': survived,
+                'assisted': self.assisted or self.invincible or self.autopilot,
+                'stages': self.profiler.summary()
+            })
+    
+    def check_replay(self):
+        if self.replay:
+            self.replay_ok = self.replay.ticks == self.ticks and self.replay.digest == self.digest()
+            print(f"[REPLAY] {'match' if self.replay_ok else 'MISMATCH'} after {self.ticks} ticks")
+            self.replay = None
+    
+    def digest(self):
+        store = self.registry.store
+        live = np.nonzero(store.alive[:len(self.registry.items)])[0]
+        h = hashlib.sha1(struct.pack('<Iq', self.ticks, self.seed or 0))
+        h.update(json.dumps(self.stats, sort_keys=True).encode())
+        for name in ('x', 'y', 'z', 'vz', 'hp', 'kind'):
+            h.update(getattr(store, name)[live].tobytes())
+        return h.digest()
+    
+    def snapshot(self):
+        return Snapshot.take(self)
+    
+    def restore(self, data):
+        Snapshot.restore(self, data)
+    
+    def resume(self):
+        data = self.checkpoints[0]
+        self.checkpoints.clear()
+        self.restore(data)
+        self.assisted = True
+    
+    def play(self, replay):
+        for name, value in replay.tuning.items():
+            setattr(self, name, value)
+        self.invincible = bool(replay.flags & 1)
+        self.autopilot = bool(replay.flags & 2)
+        self.replay = replay
+        self.replay_ok = None
+        replay.cursor = 0
+        self.start_run(replay.mode, replay.seed)
+    
+    def start_run(self, mode, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.mode = mode
+        self.ticks = 0
+        self.clock = 0.0
+        self.recording = None
+        self.checkpoints.clear()
+        self.assisted = False
+        self.key_states.clear()
+        self.mouse_states.clear()
+        self.fire_requested = self.bomb_requested = False
+        if self.replay is None:
+            flags = self.invincible | self.autopilot << 1
+            tuning = {name: getattr(self, name) for name in TUNING_KEYS}
+            self.recording = Replay(self.seed, mode, flags, tuning)
+        self.stats['pace'] = self.mode_speeds[mode]
+        self.stats['points'] = 0
+        self.stats['travel'] = 0
+        self.stats['defeats'] = 0
+        self.stats['damage'] = 0
+        self.profiler.reset()
+        self.switch_phase('RUNNING')
+    
+    def step(self, elapsed):
+        self.read_inputs()
+        if self.replay:
+            for event in self.replay.due(self.ticks):
+                self.apply_event(*event[1:])
+        elif self.recording:
+            self.recording.step = elapsed
+        if self.active_phase_name == 'RUNNING':
+            self._weapons()
+        self.clock += elapsed
+        self.ticks += 1
+        self.registry.store.save_previous()
+        next_phase = self.active_phase.tick(elapsed)
+        if next_phase:
+            self.switch_phase(next_phase)
+        elif self.replay and self.ticks >= self.replay.ticks:
+            self.check_replay()
+            self.assisted = True
+        elif self.checkpoint_every and self.ticks % self.checkpoint_every == 0:
+            self.checkpoints.append(self.snapshot())
+    
+    def update_world(self):
+        current = time.perf_counter()
+        tick = self.replay.step if self.replay else 1 / self.tick_rate
+        self.accumulator += min(current - self.timer, tick * self.max_catchup)
+        self.timer = current
+        
+        with self.profiler.stage('update_world'):
+            steps = 0
+            while self.accumulator >= tick and steps < self.max_catchup:
+                self.step(tick)
+                self.accumulator -= tick
+                steps += 1
+        
+        self.accumulator = min(self.accumulator, tick)
+        self.alpha = self.accumulator / tick
+    
+    def draw_world(self):
+        with self.profiler.stage('draw_world'):
+            self.active_phase.paint()
+    
+    def dump_profile(self, directory):
+        report = self.profiler.report(pools=self.registry.pool_stats(), startup_s=self.startup)
+        return self.write_file(save_profile, directory, report)
+    
+    def write_file(self, save, *args):
+        if self.files:
+            self.files.put(save, *args)
+        else:
+            return save(*args)
+    
+    def read_inputs(self):
+        now = time.perf_counter()
+        for stamp, kind, code, extra, x, y in self.inputs.drain():
+            self.profiler.record('input_latency', now - stamp)
+            if self.active_phase_name == 'RUNNING':
+                if self.replay:
+                    continue
+                if self.recording:
+                    self.recording.record(self.ticks, kind, code, extra, x, y)
+            self.apply_event(kind, code, extra, x, y)
+    
+    def apply_event(self, kind, code, extra, x, y):
+        if kind == EVENT_KEY:
+            self._key_down(bytes([code]))
+        elif kind == EVENT_KEY_UP:
+            self._key_up(bytes([code]))
+        elif kind == EVENT_SPECIAL:
+            self._special_key_down(code)
+        elif kind == EVENT_MOUSE:
+            self._mouse_action(code, extra, x, y)
+    
+    def key_down(self, key):
+        self.inputs.push(EVENT_KEY, key[0])
+    
+    def key_up(self, key):
+        self.inputs.push(EVENT_KEY_UP, key[0])
+    
+    def special_key_down(self, key):
+        self.inputs.push(EVENT_SPECIAL, key)
+    
+    def mouse_action(self, btn, action, x, y):
+        self.inputs.push(EVENT_MOUSE, btn, action, x, y)
+    
+    def _key_down(self, key):
+        self.key_states[key.lower()] = True
+        
+        if self.active_phase_name == 'MENU':
+            next_phase = self.active_phase.process_key(key)
+            if next_phase:
+                self.start_run(self.active_phase.mode_choice)
+        
+        elif self.active_phase_name == 'RUNNING':
+            if key in (b'g', b'G'):
+                self.invincible = not self.invincible
+                self.assisted |= self.invincible
+                status = "ENABLED" if self.invincible else "DISABLED"
+                print(f"[GOD MODE] {status}")
+            elif key in (b'v', b'V'):
+                self.view_mode = 'FIRST' if self.view_mode == 'THIRD' else 'THIRD'
+            elif key in (b'p', b'P'):
+                self.show_profile = not self.show_profile
+            elif key in (b'i', b'I'):
+                self.fire_requested = True
+            elif key in (b'k', b'K'):
+                self.bomb_requested = True
+        
+        elif self.active_phase_name == 'FINISHED':
+            next_phase = self.active_phase.process_key(key)
+            if next_phase == 'RUNNING':
+                self.resume()
+            elif next_phase:
+                self.switch_phase(next_phase)
+    
+    def _key_up(self, key):
+        self.key_states[key.lower()] = False
+
+    def _special_key_down(self, key):
+        if self.active_phase_name == 'RUNNING':
+            if key == KEY_LEFT:
+                trans = self.hero.fetch('transform')
+                if trans.desired_lane > 0:
+                    trans.desired_lane -= 1
+            elif key == KEY_RIGHT:
+                trans = self.hero.fetch('transform')
+                if trans.desired_lane < 2:
+                    trans.desired_lane += 1
+
+    def _mouse_action(self, btn, action, x, y):
+        self.mouse_states[btn] = action == 0
+        if self.active_phase_name == 'RUNNING' and action == 0:
+            if btn == 0:
+                self.bomb_requested = True
+            elif btn == 2:
+                self.fire_requested = True
+    
+    def _weapons(self):
+        held = self.key_states.get(b'i') or self.mouse_states.get(2)
+        if self.fire_requested or held:
+            arm = self.hero.fetch('armament')
+            if self.clock - arm.fire_time > self.fire_delay:
+                trans = self.hero.fetch('transform')
+                self.active_phase._launch_shot([trans.x, trans.y + 0.6, trans.z - 2.5], 'HERO')
+                arm.fire_time = self.clock
+        if self.bomb_requested or self.key_states.get(b'k') or self.mouse_states.get(0):
+            arm = self.hero.fetch('armament')
+            if self.clock - arm.bomb_time > self.bomb_delay:
+                trans = self.hero.fetch('transform')
+                self.active_phase._launch_shot([trans.x - 0.65, trans.y, trans.z + 2.5], 'HERO')
+                self.active_phase._launch_shot([trans.x + 0.65, trans.y, trans.z + 2.5], 'HERO')
+                arm.bomb_time = self.clock
+        self.fire_requested = self.bomb_requested = False
+
+
+class SimThread:
+    def __init__(self, world):
+        self.world = world
+        self.frame = None
+        self.running = False
+        self.thread = threading.Thread(target=self._run, name='simulation', daemon=True)
+    
+    def start(self):
+        self.running = True
+        self.world.timer = time.perf_counter()
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        self.thread.join()
+    
+    def _run(self):
+        world = self.world
+        while self.running:
+            ticks, phase = world.ticks, world.active_phase_name
+            world.update_world()
+            if self.frame is None or world.ticks != ticks or world.active_phase_name != phase:
+                self.publish()
+            tick = world.replay.step if world.replay else 1 / world.tick_rate
+            time.sleep(max(0.0, tick - world.accumulator - (time.perf_counter() - world.timer)))
+    
+    def publish(self):
+        world = self.world
+        data = world.snapshot() if world.active_phase_name == 'RUNNING' else None
+        self.frame = (world.active_phase_name, world.ticks, time.perf_counter(), data)
+
+
+def run_episode(seed=None, mode='Normal', step=SIM_STEP, max_ticks=3600, invincible=False,
+                world_type=World, profile_dir=None, autopilot=False, tuning=None, replay_dir=None,
+                checkpoint_dir=None, checkpoint_every=600, scores=None):
+    world = world_type()
+    for name, value in (tuning or {}).items():
+        if name not in TUNING_KEYS:
+            raise ValueError(f"unknown tuning parameter: {name}")
+        setattr(world, name, value)
+    world.invincible = invincible
+    world.autopilot = autopilot
+    world.profile_dir = profile_dir
+    world.replay_dir = replay_dir
+    world.scores = scores
+    if checkpoint_dir:
+        world.checkpoint_every = checkpoint_every
+    world.start_run(mode, seed)
+    return play_out(world, step, max_ticks, checkpoint_dir)
+
+def resume_episode(path, step=SIM_STEP, max_ticks=3600, world_type=World, checkpoint_dir=None,
+                   checkpoint_every=600):
+    world = world_type()
+    with open(path, 'rb') as f:
+        world.restore(f.read())
+    if checkpoint_dir:
+        world.checkpoint_every = checkpoint_every
+    return play_out(world, step, max_ticks, checkpoint_dir)
+
+def replay_episode(path, world_type=World):
+    replay = Replay.load(path)
+    world = world_type()
+    world.play(replay)
+    result = play_out(world, replay.step, replay.ticks)
+    world.check_replay()
+    result['match'] = world.replay_ok
+    return result
+
+def check_replays(episodes, seed=0, max_ticks=1200, world_type=World):
+    world = world_type()
+    mismatches = 0
+    for n in range(episodes):
+        rng = random.Random(seed + n)
+        world.invincible = n % 2 == 1
+        for k in range(rng.randrange(30, 300)):
+            world.step(SIM_STEP)
+        world.key_down(bytes([rng.choice(b'123')]))
+        world.key_down(b'\t')
+        world.step(SIM_STEP)
+        recording = world.recording
+        while world.ticks < max_ticks and world.active_phase_name == 'RUNNING':
+            roll = rng.random()
+            if roll < 0.05:
+                world.special_key_down(rng.choice((KEY_LEFT, KEY_RIGHT)))
+            elif roll < 0.06:
+                world.key_down(b'i')
+            elif roll < 0.07:
+                world.key_up(b'i')
+            elif roll < 0.08:
+                world.mouse_action(rng.choice((0, 2)), rng.randrange(2), 0, 0)
+            world.step(SIM_STEP)
+        if world.active_phase_name == 'RUNNING':
+            world.close_recording()
+        viewer = world_type()
+        viewer.play(recording)
+        while viewer.replay and viewer.ticks <= recording.ticks:
+            viewer.step(recording.step)
+        mismatches += not viewer.replay_ok
+        world.switch_phase('MENU')
+    return mismatches
+
+def play_out(world, step, max_ticks, checkpoint_dir=None):
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        path = os.path.join(checkpoint_dir, f"seed-{world.seed}.dds")
+    while world.ticks < max_ticks and world.active_phase_name == 'RUNNING':
+        with world.profiler.stage('step'):
+            world.step(step)
+        if checkpoint_dir and world.checkpoints and world.ticks % world.checkpoint_every == 0:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(world.checkpoints[-1])
+            os.replace(path + '.tmp', path)
+    if world.active_phase_name == 'RUNNING':
+        world.submit_score(True)
+        world.close_recording()
+    
+    return {
+        'seed': world.seed,
+        'mode': world.mode,
+        'ticks': world.ticks,
+        'survived': world.active_phase_name == 'RUNNING',
+        'travel': world.stats['travel'],
+        'points': world.stats['points'],
+        'defeats': world.stats['defeats'],
+        'damage': world.stats['damage'],
+        'hp': float(world.hero.fetch('vitality').val)
+    }
+
+def run_batch(episodes, seed=0, **kwargs):
+    return [run_episode(seed + n, **kwargs) for n in range(episodes)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Dhaka Dash headless at a fixed timestep.")
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', choices=list(MODE_SPEEDS), default='Normal')
+    parser.add_argument('--ticks', type=int, default=3600, help="tick limit per episode")
+    parser.add_argument('--hz', type=float, default=60.0, help="simulation rate")
+    parser.add_argument('--god', action='store_true', help="run with god mode on")
+    parser.add_argument('--autopilot', action='store_true', help="let the god mode driver steer without invincibility")
+    parser.add_argument('--profile-dir', help="write per-stage timings here when an episode ends")
+    parser.add_argument('--replay-dir', help="record every episode's seed and inputs here")
+    parser.add_argument('--replay', help="play back a recorded .ddr file and check it matches")
+    parser.add_argument('--checkpoint-dir', help="keep the latest snapshot of each episode here")
+    parser.add_argument('--checkpoint-every', type=int, default=600, help="ticks between snapshots")
+    parser.add_argument('--resume', help="continue an episode from a .dds snapshot up to --ticks")
+    parser.add_argument('--scores', help="log every episode's score and stage timings to this SQLite file")
+    parser.add_argument('--check-replays', type=int, metavar='N',
+                        help="record N input-driven runs started from an idle menu and check each replays exactly")
+    args = parser.parse_args()
+    
+    if args.replay:
+        result = replay_episode(args.replay)
+        print(f"seed {result['seed']} {result['mode']}: {result['ticks']} ticks, "
+              f"travel {result['travel']:.1f}, points {result['points']}")
+        raise SystemExit(0 if result['match'] else 1)
+    
+    if args.check_replays:
+        mismatches = check_replays(args.check_replays, seed=args.seed, max_ticks=args.ticks)
+        print(f"{args.check_replays - mismatches}/{args.check_replays} replays matched")
+        raise SystemExit(1 if mismatches else 0)
+    
+    if args.resume:
+        result = resume_episode(args.resume, 1 / args.hz, args.ticks, checkpoint_dir=args.checkpoint_dir,
+                                checkpoint_every=args.checkpoint_every)
+        print(f"seed {result['seed']} {result['mode']}: {result['ticks']} ticks, "
+              f"travel {result['travel']:.1f}, points {result['points']}, "
+              f"{'survived' if result['survived'] else 'wrecked'}")
+        return
+    
+    scores = None
+    if args.scores:
+        import dhaka_scores
+        scores = dhaka_scores.ScoreStore(args.scores)
+    start = time.perf_counter()
+    results = run_batch(args.episodes, seed=args.seed, mode=args.mode, step=1 / args.hz,
+                        max_ticks=args.ticks, invincible=args.god, profile_dir=args.profile_dir,
+                        autopilot=args.autopilot, replay_dir=args.replay_dir,
+                        checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every,
+                        scores=scores)
+    spent = time.perf_counter() - start
+    if scores:
+        scores.close()
+    
+    ticks = sum(r['ticks'] for r in results)
+    survived = sum(1 for r in results if r['survived'])
+    print(f"{args.episodes} episodes, {ticks} ticks in {spent:.2f}s "
+          f"({args.episodes / spent:.1f} episodes/s, {ticks / spent:.0f} ticks/s)")
+    print(f"survived: {survived}/{args.episodes}")
+    for key in ('travel', 'points', 'defeats'):
+        mean = sum(r[key] for r in results) / len(results)
+        print(f"mean {key}: {mean:.1f}")
+
+if __name__ == "__main__":
+    main()